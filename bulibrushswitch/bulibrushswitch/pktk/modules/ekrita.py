@@ -34,7 +34,9 @@
 #
 # -----------------------------------------------------------------------------
 
-from enum import Enum
+from enum import IntEnum
+from contextlib import contextmanager
+from functools import lru_cache
 import xml.etree.ElementTree as ETree
 import re
 import base64
@@ -49,10 +51,12 @@ from krita import (
 
 from PyQt5.QtCore import (
         QByteArray,
+        QCoreApplication,
         QEventLoop,
         QMimeData,
         QPoint,
         QRect,
+        QThread,
         QTimer,
         QUuid,
     )
@@ -900,6 +904,15 @@ class EKritaResizeMethods:
 class EKritaDocument:
     """Provides methods to manage Krita Documents"""
 
+    __RE_PATH_NODES = re.compile(r'(?:[^/"]|"(?:\\.|[^"])*")+')
+    __RE_PATH_QUOTES = re.compile(r'^"|"$')
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def __parsePath(path):
+        """Return a tuple of nodes names from given layer `path`"""
+        return tuple(EKritaDocument.__RE_PATH_QUOTES.sub('', pathNode) for pathNode in EKritaDocument.__RE_PATH_NODES.findall(path))
+
     @staticmethod
     def findLayerById(document, layerId):
         """Find a layer by ID in document
@@ -983,17 +996,26 @@ class EKritaDocument:
         - "re://my_regular_expression
         """
         def find(layerName, isRegex, parentLayer):
-            """sub function called recursively to search layer in document tree"""
+            """sub function used to search layer in document tree
+
+            Tree is walked with an explicit stack of iterators rather than with
+            recursive calls; returned list order is the same
+            """
             returned = []
-            for layer in reversed(parentLayer.childNodes()):
-                if isRegex is False and layerName == layer.name():
-                    returned.append(layer)
-                elif isRegex is True and (reResult := re.match(layerName, layer.name())):
-                    returned.append(layer)
-                elif len(layer.childNodes()) > 0:
-                    found = find(layerName, isRegex, layer)
-                    if found is not None:
-                        returned += found
+            stack = [iter(reversed(parentLayer.childNodes()))]
+            while stack:
+                for layer in stack[-1]:
+                    if isRegex is False and layerName == layer.name():
+                        returned.append(layer)
+                    elif isRegex is True and (reResult := re.match(layerName, layer.name())):
+                        returned.append(layer)
+                    elif len(childNodes := layer.childNodes()) > 0:
+                        # process sub-nodes before next siblings
+                        stack.append(iter(reversed(childNodes)))
+                        break
+                else:
+                    # all nodes from current level have been processed
+                    stack.pop()
             return returned
 
         if not (isinstance(searchFrom, Document) or isinstance(searchFrom, Layer)):
@@ -1026,14 +1048,26 @@ class EKritaDocument:
         If `recursiveSubLayers` is True, also return all subLayers
         """
         def find(recursiveSubLayers, parentLayer):
-            """sub function called recursively to search layer in document tree"""
+            """sub function used to search layer in document tree
+
+            Tree is walked with an explicit stack of iterators rather than with
+            recursive calls; returned list order is the same
+            """
+            if not recursiveSubLayers:
+                return list(reversed(parentLayer.childNodes()))
+
             returned = []
-            for layer in reversed(parentLayer.childNodes()):
-                returned.append(layer)
-                if recursiveSubLayers and len(layer.childNodes()) > 0:
-                    found = find(recursiveSubLayers, layer)
-                    if found is not None:
-                        returned += found
+            stack = [iter(reversed(parentLayer.childNodes()))]
+            while stack:
+                for layer in stack[-1]:
+                    returned.append(layer)
+                    if len(childNodes := layer.childNodes()) > 0:
+                        # process sub-nodes before next siblings
+                        stack.append(iter(reversed(childNodes)))
+                        break
+                else:
+                    # all nodes from current level have been processed
+                    stack.pop()
             return returned
 
         if not (isinstance(searchFrom, Document) or isinstance(searchFrom, Layer)):
@@ -1071,10 +1105,9 @@ class EKritaDocument:
         elif not isinstance(path, str):
             raise EInvalidType("Given `path` must be a <str>")
 
-        pathNodes = re.findall(r'(?:[^/"]|"(?:\\.|[^"])*")+', path)
-
-        if pathNodes is not None:
-            pathNodes = [re.sub(r'^"|"$', '', pathNode) for pathNode in pathNodes]
+        pathNodes = EKritaDocument.__parsePath(path)
+        if len(pathNodes) == 0:
+            return None
 
         return find(pathNodes, 0, searchFrom.rootNode())
 
@@ -1082,21 +1115,89 @@ class EKritaDocument:
 class EKritaNode:
     """Provides methods to manage Krita Nodes"""
 
-    class ProjectionMode(Enum):
-        """Projection modes for toQImage(), toQPixmap()"""
+    class ProjectionMode(IntEnum):
+        """Projection modes for toQImage(), toQPixmap()
+
+        Defined as IntEnum: comparison are made as plain int
+        """
         FALSE = 0
         TRUE = 1
         AUTO = 2
 
     __projectionMode = ProjectionMode.AUTO
 
+    # methods a QObject must provide to be considered as a Node, by toQImage() and fromQImage()
+    __NODE_ATTRIBUTES_TOQIMAGE = frozenset(('type', 'bounds', 'childNodes', 'colorModel', 'colorDepth', 'colorProfile', 'setColorSpace', 'setPixelData'))
+    __NODE_ATTRIBUTES_FROMQIMAGE = frozenset(('type', 'colorModel', 'colorDepth', 'colorProfile', 'setColorSpace', 'setPixelData'))
+
+    @staticmethod
+    def __checkNode(layerNode, attributes):
+        """Raise an EInvalidType exception if given `layerNode` is not a Node
+
+        Given `attributes` are methods a QObject must provide to be considered as a Node
+
+        NOTE: layerNode can be a QObject...
+              that's weird, but document.nodeByUniqueID() return a QObject for a paintlayer (other Nodes seems to be Ok...)
+              it can sound strange but in this case the returned QObject is a QObject iwht Node properties
+              so, need to check if QObject have expected methods
+        """
+        if isinstance(layerNode, Node):
+            # most common case, no need to go further
+            return
+        elif type(layerNode) is QObject and all(hasattr(layerNode, attribute) for attribute in attributes):
+            return
+        # consider that it's not a node
+        raise EInvalidType("Given `layerNode` must be a valid Krita <Node> ")
+
     @staticmethod
     def __sleep(value):
-        """Sleep for given number of milliseconds"""
+        """Sleep for given number of milliseconds
+
+        - From a worker thread, thread is simply paused
+        - From GUI thread, a local event loop is executed during delay, to let
+          Krita process pending events (like active node changed)
+        """
+        if QThread.currentThread() != QCoreApplication.instance().thread():
+            QThread.msleep(value)
+            return
+
+        # QCoreApplication.processEvents(QEventLoop.AllEvents, value) can't be
+        # used here: it returns as soon as there's no more pending events, and
+        # then doesn't wait for asynchronous Krita updates
         loop = QEventLoop()
         QTimer.singleShot(value, loop.quit)
         loop.exec()
 
+    @staticmethod
+    @contextmanager
+    def colorSpaceRGBA8(layerNode):
+        """Context manager that ensure `layerNode` color space is RGBA/U8
+
+        If needed, layer is converted to RGBA/U8 when entering context and
+        converted back to its original color space when leaving context
+
+        Allows to paste many images with fromQImage()/fromQPixmap() with only
+        2 color space conversions:
+
+            with EKritaNode.colorSpaceRGBA8(layerNode):
+                for image, position in images:
+                    EKritaNode.fromQImage(layerNode, image, position)
+        """
+        layerColorModel = layerNode.colorModel()
+        layerColorDepth = layerNode.colorDepth()
+        layerColorProfile = layerNode.colorProfile()
+
+        layerNeedBackConversion = (layerColorModel != "RGBA" or layerColorDepth != 'U8')
+
+        if layerNeedBackConversion:
+            # we need to convert layer to RGBA/U8
+            layerNode.setColorSpace("RGBA", "U8", "sRGB-elle-V2-srgbtrc.icc")
+        try:
+            yield layerNode
+        finally:
+            if layerNeedBackConversion:
+                layerNode.setColorSpace(layerColorModel, layerColorDepth, layerColorProfile)
+
     @staticmethod
     def path(layerNode):
         """Return `layerNode` path in tree
@@ -1112,19 +1213,27 @@ class EKritaNode:
             return '/groupLayer1/groupLayer2/theNode'
             return '/groupLayer1/groupLayer2/"theNode with / character"'
         """
-        def parentPath(layerNode):
-            if layerNode.parentNode() is None or layerNode.parentNode().parentNode() is None:
-                return ''
-            else:
-                if '/' in layerNode.name():
-                    return f'{parentPath(layerNode.parentNode())}/"{layerNode.name()}"'
-                else:
-                    return f'{parentPath(layerNode.parentNode())}/{layerNode.name()}'
-
         if not isinstance(layerNode, Node):
             raise EInvalidType("Given `layerNode` must be a valid Krita <Node> ")
 
-        return parentPath(layerNode)
+        # walk up to root node (root node is not part of path)
+        # iterative loop, parentNode() and name() are called once per level
+        names = []
+        parentNode = layerNode.parentNode()
+        while parentNode is not None:
+            name = layerNode.name()
+            if '/' in name:
+                names.append(f'"{name}"')
+            else:
+                names.append(name)
+            layerNode = parentNode
+            parentNode = layerNode.parentNode()
+
+        if len(names) <= 1:
+            # given node is root node or a direct child of root node
+            return ''
+        # last name is the one from root node direct child, not returned in path
+        return '/' + '/'.join(reversed(names[:-1]))
 
     @staticmethod
     def toQImage(layerNode, rect=None, projectionMode=None):
@@ -1138,25 +1247,7 @@ class EKritaNode:
         if layerNode is None:
             raise EInvalidValue("Given `layerNode` can't be None")
 
-        if type(layerNode) == QObject:
-            # NOTE: layerNode can be a QObject...
-            #       that's weird, but document.nodeByUniqueID() return a QObject for a paintlayer (other Nodes seems to be Ok...)
-            #       it can sound strange but in this case the returned QObject is a QObject iwht Node properties
-            #       so, need to check if QObject have expected methods
-            if (hasattr(layerNode, 'type') and
-               hasattr(layerNode, 'bounds') and
-               hasattr(layerNode, 'childNodes') and
-               hasattr(layerNode, 'colorModel') and
-               hasattr(layerNode, 'colorDepth') and
-               hasattr(layerNode, 'colorProfile') and
-               hasattr(layerNode, 'setColorSpace') and
-               hasattr(layerNode, 'setPixelData')):
-                pass
-            else:
-                # consider that it's not a node
-                raise EInvalidType("Given `layerNode` must be a valid Krita <Node> ")
-        elif not isinstance(layerNode, Node):
-            raise EInvalidType("Given `layerNode` must be a valid Krita <Node> ")
+        EKritaNode.__checkNode(layerNode, EKritaNode.__NODE_ATTRIBUTES_TOQIMAGE)
 
         if rect is None:
             rect = layerNode.bounds()
@@ -1165,6 +1256,20 @@ class EKritaNode:
         elif not isinstance(rect, QRect):
             raise EInvalidType("Given `rect` must be a valid Krita <Document>, a <QRect> or None")
 
+        x, y, width, height = rect.left(), rect.top(), rect.width(), rect.height()
+        nodeType = layerNode.type()
+
+        # Need to check what todo for:
+        # - masks (8bit/pixels)
+        # - other color space (need to convert to 8bits/rgba...?)
+        if (nodeType in ('transparencymask', 'filtermask', 'transformmask', 'selectionmask') or
+           layerNode.colorModel() != 'RGBA' or
+           layerNode.colorDepth() != 'U8'):
+            # pixelData/projectionPixelData return a 8bits/pixel matrix
+            # didn't find how to convert pixel data to QImlage then use thumbnail() function
+            return layerNode.thumbnail(width, height)
+
+        # projection mode is only needed from here
         if projectionMode is None:
             projectionMode = EKritaNode.__projectionMode
         if projectionMode == EKritaNode.ProjectionMode.AUTO:
@@ -1175,20 +1280,10 @@ class EKritaNode:
             else:
                 projectionMode = EKritaNode.ProjectionMode.TRUE
 
-        # Need to check what todo for:
-        # - masks (8bit/pixels)
-        # - other color space (need to convert to 8bits/rgba...?)
-        if (layerNode.type() in ('transparencymask', 'filtermask', 'transformmask', 'selectionmask') or
-           layerNode.colorModel() != 'RGBA' or
-           layerNode.colorDepth() != 'U8'):
-            # pixelData/projectionPixelData return a 8bits/pixel matrix
-            # didn't find how to convert pixel data to QImlage then use thumbnail() function
-            return layerNode.thumbnail(rect.width(), rect.height())
+        if projectionMode == EKritaNode.ProjectionMode.TRUE:
+            return QImage(layerNode.projectionPixelData(x, y, width, height), width, height, QImage.Format_ARGB32)
         else:
-            if projectionMode == EKritaNode.ProjectionMode.TRUE:
-                return QImage(layerNode.projectionPixelData(rect.left(), rect.top(), rect.width(), rect.height()), rect.width(), rect.height(), QImage.Format_ARGB32)
-            else:
-                return QImage(layerNode.pixelData(rect.left(), rect.top(), rect.width(), rect.height()), rect.width(), rect.height(), QImage.Format_ARGB32)
+            return QImage(layerNode.pixelData(x, y, width, height), width, height, QImage.Format_ARGB32)
 
     @staticmethod
     def toQPixmap(layerNode, rect=None, projectionMode=None):
@@ -1212,23 +1307,7 @@ class EKritaNode:
         - None, in this case, pixmap will be pasted at position (0, 0)
         - A QPoint() object, pixmap will be pasted at defined position
         """
-        # NOTE: layerNode can be a QObject...
-        #       that's weird, but document.nodeByUniqueID() return a QObject for a paintlayer (other Nodes seems to be Ok...)
-        #       it can sound strange but in this case the returned QObject is a QObject iwht Node properties
-        #       so, need to check if QObject have expected methods
-        if type(layerNode) == QObject():
-            if (hasattr(layerNode, 'type') and
-               hasattr(layerNode, 'colorModel') and
-               hasattr(layerNode, 'colorDepth') and
-               hasattr(layerNode, 'colorProfile') and
-               hasattr(layerNode, 'setColorSpace') and
-               hasattr(layerNode, 'setPixelData')):
-                pass
-            else:
-                # consider that it's not a node
-                raise EInvalidType("Given `layerNode` must be a valid Krita <Node> ")
-        elif not isinstance(layerNode, Node):
-            raise EInvalidType("Given `layerNode` must be a valid Krita <Node> ")
+        EKritaNode.__checkNode(layerNode, EKritaNode.__NODE_ATTRIBUTES_FROMQIMAGE)
 
         if not isinstance(image, QImage):
             raise EInvalidType("Given `image` must be a valid <QImage> ")
@@ -1239,23 +1318,13 @@ class EKritaNode:
         if not isinstance(position, QPoint):
             raise EInvalidType("Given `position` must be a valid <QPoint> ")
 
-        layerNeedBackConversion = False
-        layerColorModel = layerNode.colorModel()
-        layerColorDepth = layerNode.colorDepth()
-        layerColorProfile = layerNode.colorProfile()
-
-        if layerColorModel != "RGBA" or layerColorDepth != 'U8':
-            # we need to convert layer to RGBA/U8
-            layerNode.setColorSpace("RGBA", "U8", "sRGB-elle-V2-srgbtrc.icc")
-            layerNeedBackConversion = True
-
         ptr = image.bits()
         ptr.setsize(image.byteCount())
 
-        layerNode.setPixelData(QByteArray(ptr.asstring()), position.x(), position.y(), image.width(), image.height())
-
-        if layerNeedBackConversion:
-            layerNode.setColorSpace(layerColorModel, layerColorDepth, layerColorProfile)
+        # if called inside a colorSpaceRGBA8() context, layer is already
+        # RGBA/U8 and no conversion is made here
+        with EKritaNode.colorSpaceRGBA8(layerNode):
+            layerNode.setPixelData(QByteArray(ptr.asstring()), position.x(), position.y(), image.width(), image.height())
 
     @staticmethod
     def fromQPixmap(layerNode, pixmap, position=None):
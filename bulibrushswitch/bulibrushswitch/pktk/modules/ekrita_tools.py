@@ -20,11 +20,16 @@
 # - EKritaToolsCategory
 #       Provides tools categories
 #
+# - EKritaToolDefinition
+#       Provides a tool definition
+#
 # - EKritaTools:
 #       Provides methods for quick access to tools
 #
 # -----------------------------------------------------------------------------
 
+from types import MappingProxyType
+
 from krita import *
 
 from PyQt5.QtWidgets import (
@@ -105,6 +110,25 @@ class EKritaToolsCategory:
     VIEW =      'view'
 
 
+class EKritaToolDefinition:
+    """Definition of a tool"""
+    __slots__ = ('label', 'category', 'icon', 'widget')
+
+    def __init__(self, label, category, icon, widget=None):
+        self.label = label
+        self.category = category
+        self.icon = icon
+        self.widget = widget
+
+    def toDict(self):
+        """Return definition as a dictionary"""
+        return {'label': self.label,
+                'category': self.category,
+                'icon': self.icon,
+                'widget': self.widget
+                }
+
+
 class EKritaTools:
     """Tools definition"""
 
@@ -335,6 +359,16 @@ class EKritaTools:
             'widget': None
             }
         }
+    # freeze tools table; widget is the only value updated at runtime
+    __TOOLS = MappingProxyType({id: EKritaToolDefinition(**definition) for id, definition in __TOOLS.items()})
+
+    # tools id, globally and by category
+    __ALL_IDS = tuple(__TOOLS)
+    __IDS_BY_CATEGORY = {}
+    for id, definition in __TOOLS.items():
+        __IDS_BY_CATEGORY.setdefault(definition.category, []).append(id)
+    __IDS_BY_CATEGORY = MappingProxyType({category: tuple(ids) for category, ids in __IDS_BY_CATEGORY.items()})
+    del id, definition
 
     __notifier = None
     __toolbox = None
@@ -350,7 +384,7 @@ class EKritaTools:
             def _update():
                 EKritaTools.notifier.toolChanged.emit(id, True)
 
-            if EKritaTools.__TOOLS[id]['widget'].isChecked():
+            if EKritaTools.__TOOLS[id].widget.isChecked():
                 # When change is applied, especially when tool is activated, it could be a good thing
                 # to wait 2-3milliseconds before processing anything in triggered event:
                 # - signal is emitted when tool button is toggled
@@ -370,10 +404,10 @@ class EKritaTools:
 
                 EKritaTools.__signalMapper.mapped[str].connect(__toolChanged)
 
-                for id in list(EKritaTools.__TOOLS.keys()):
+                for id in EKritaTools.__ALL_IDS:
                     toolButton = EKritaTools.__toolbox.findChild(QToolButton, id)
                     if toolButton:
-                        EKritaTools.__TOOLS[id]['widget'] = toolButton
+                        EKritaTools.__TOOLS[id].widget = toolButton
                         toolButton.toggled.connect(EKritaTools.__signalMapper.map)
                         EKritaTools.__signalMapper.setMapping(toolButton, id)
 
@@ -393,15 +427,21 @@ class EKritaTools:
 
         if given `filter` is not valid, return empty list
         """
+        return list(EKritaTools.__ids(filter))
+
+    @staticmethod
+    def __ids(filter=None):
+        """Return tuple of tools Id matching given `filter`
+
+        Internal version of list(), without copy
+        """
         if filter is None:
-            return list(EKritaTools.__TOOLS.keys())
-        else:
-            if isinstance(filter, str):
-                # convert to list
-                filter = [filter]
-            if isinstance(filter, (list, tuple)):
-                return [id for id in list(EKritaTools.__TOOLS.keys()) if EKritaTools.__TOOLS[id]['category'] in filter]
-        return []
+            return EKritaTools.__ALL_IDS
+        elif isinstance(filter, str):
+            return EKritaTools.__IDS_BY_CATEGORY.get(filter, ())
+        elif isinstance(filter, (list, tuple)):
+            return tuple(id for id in EKritaTools.__ALL_IDS if EKritaTools.__TOOLS[id].category in filter)
+        return ()
 
     @staticmethod
     def get(id):
@@ -412,42 +452,37 @@ class EKritaTools:
             'category': <str>, group for tool
             'widget': <QWidget>, widget for tool
         """
-        try:
-            return EKritaTools.__TOOLS[id]
-        except Exception:
+        if id not in EKritaTools.__TOOLS:
             raise EInvalidValue("Given `id` is not valid")
+        return EKritaTools.__TOOLS[id].toDict()
 
     @staticmethod
     def name(id):
         """Return tool label definition for given id"""
-        try:
-            return EKritaTools.__TOOLS[id]['label']
-        except Exception:
+        if id not in EKritaTools.__TOOLS:
             raise EInvalidValue("Given `id` is not valid")
+        return EKritaTools.__TOOLS[id].label
 
     @staticmethod
     def iconName(id):
         """Return tool icon name definition for given id"""
-        try:
-            return EKritaTools.__TOOLS[id]['icon']
-        except Exception:
+        if id not in EKritaTools.__TOOLS:
             raise EInvalidValue("Given `id` is not valid")
+        return EKritaTools.__TOOLS[id].icon
 
     @staticmethod
     def icon(id):
         """Return tool icon definition for given id"""
-        try:
-            return Krita.instance().icon(EKritaTools.__TOOLS[id]['icon'])
-        except Exception:
+        if id not in EKritaTools.__TOOLS:
             raise EInvalidValue("Given `id` is not valid")
+        return Krita.instance().icon(EKritaTools.__TOOLS[id].icon)
 
     @staticmethod
     def category(id):
         """Return tool category definition for given id"""
-        try:
-            return EKritaTools.__TOOLS[id]['category']
-        except Exception:
+        if id not in EKritaTools.__TOOLS:
             raise EInvalidValue("Given `id` is not valid")
+        return EKritaTools.__TOOLS[id].category
 
     @staticmethod
     def current(filter=None):
@@ -458,8 +493,8 @@ class EKritaTools:
 
         if given `filter` is not valid, return None
         """
-        for id in EKritaTools.list(filter):
-            toolButton = EKritaTools.__TOOLS[id]['widget']
+        for id in EKritaTools.__ids(filter):
+            toolButton = EKritaTools.__TOOLS[id].widget
             if toolButton and toolButton.isChecked():
                 return id
         return None
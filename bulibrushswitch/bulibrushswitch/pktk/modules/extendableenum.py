@@ -22,44 +22,61 @@
 #   https://zestedesavoir.com/tutoriels/954/notions-de-python-avancees/4-classes/2-metaclasses/
 # -----------------------------------------------------------------------------
 
+from types import MappingProxyType
+
+
 class ExtendableEnumMeta(type):
     """Metaclass for ExtendableEnum class"""
     def __new__(cls, name, bases, dict):
-        # create a cache to avoid to recreate instances everytime
-        dict['__cache__'] = {}
-
         # create a dictionnary of class members
         # - exclude magic names from member list
         members = {name: value for (name, value) in dict.items() if not (name.startswith('__') and name.endswith('__'))}
 
+        # create a cache to avoid to recreate instances everytime
+        cache = {}
+        dict['__cache__'] = cache
+
         # create class extendableEnum
         extendableEnum = super().__new__(cls, name, bases, dict)
 
+        # all members (inherited ones first), as {name: instance}
+        # built once for class, avoid to scan dir() to retrieve them
+        allMembers = {}
+        for base in reversed(bases):
+            allMembers.update(getattr(base, '__members__', {}))
+
         # Instanciate all possible values and add them as attribute of created class
+        # - instances are built and cached directly, without going through
+        #   ExtendableEnum.__new__() dispatch
         for name, value in members.items():
-            value = extendableEnum(value)
+            instanciedValue = object.__new__(extendableEnum)
+            instanciedValue.value = value
+            instanciedValue.name = name
 
-            # define member name
-            value.name = name
+            cache[value] = instanciedValue
 
             # define member as class attribute
-            setattr(extendableEnum, name, value)
+            setattr(extendableEnum, name, instanciedValue)
+            allMembers[name] = instanciedValue
+
+        extendableEnum.__members__ = MappingProxyType(allMembers)
         return extendableEnum
 
 
 class ExtendableEnum(metaclass=ExtendableEnumMeta):
     def __new__(cls, value):
-        # if value exists in cache (has already been instancied), return ir
-        if value in cls.__cache__:
-            return cls.__mapping__[value]
+        # if value exists in cache (has already been instancied), return it
+        try:
+            return cls.__cache__[value]
+        except KeyError:
+            pass
 
         instanciedValue = super().__new__(cls)
         instanciedValue.value = value
-        instanciedValue.name = 'toto'
+        instanciedValue.name = None
 
         cls.__cache__[value] = instanciedValue
         return instanciedValue
 
     def __repr__(self):
         return f'<{type(self).__name__}({self.name}, {self.value})>'
-
@@ -19,6 +19,7 @@ from PyQt5.QtGui import (
         QBrush,
         QPainter,
         QPixmap,
+        QPixmapCache,
         QColor,
         QPolygon,
         QPen,
@@ -26,15 +27,28 @@ from PyQt5.QtGui import (
         QImage
     )
 
-from math import ceil
+from functools import lru_cache
+import os
 import re
 import pickle
+import struct
 
 from ..pktk import *
 
 
+_RE_PKTK_URI = re.compile(r"^pktk:(.*)")
+_RE_KRITA_URI = re.compile(r"^krita:(.*)")
+_RE_URI_SCHEME = re.compile(r"^(pktk|krita):")
+_RE_ICON_RES = re.compile(r"^:/(?:pktk/images/normal/(?P<pktk>.+)|(?:16_dark|dark)_(?P<krita>.*)\.svg)$")
+
+
 def warningAreaBrush(size=32):
     """Return a checker board brush"""
+    cacheKey = f'pktk:warningAreaBrush:{size}'
+    tmpPixmap = QPixmapCache.find(cacheKey)
+    if tmpPixmap is not None and not tmpPixmap.isNull():
+        return QBrush(tmpPixmap)
+
     tmpPixmap = QPixmap(size, size)
     tmpPixmap.fill(QColor(255, 255, 255, 32))
     brush = QBrush(QColor(0, 0, 0, 32))
@@ -45,17 +59,23 @@ def warningAreaBrush(size=32):
     canvas.setBrush(brush)
 
     s1 = size >> 1
-    s2 = size - s1
 
-    canvas.setRenderHint(QPainter.Antialiasing, True)
+    # pattern is tiled, no need for anti-aliased edges
+    canvas.setRenderHint(QPainter.Antialiasing, False)
     canvas.drawPolygon(QPolygon([QPoint(s1, 0), QPoint(size, 0), QPoint(0, size), QPoint(0, s1)]))
     canvas.drawPolygon(QPolygon([QPoint(size, s1), QPoint(size, size), QPoint(s1, size)]))
     canvas.end()
 
+    QPixmapCache.insert(cacheKey, tmpPixmap)
     return QBrush(tmpPixmap)
 
 
-def checkerBoardBrush(size=32, color1=QColor(255, 255, 255), color2=QColor(220, 220, 220), strictSize=True):
+# checker board default colors
+_CHECKERBOARD_COLOR1 = QColor(255, 255, 255)
+_CHECKERBOARD_COLOR2 = QColor(220, 220, 220)
+
+
+def checkerBoardBrush(size=32, color1=_CHECKERBOARD_COLOR1, color2=_CHECKERBOARD_COLOR2, strictSize=True):
     """Return a checker board brush"""
     s1 = size >> 1
     if strictSize:
@@ -65,6 +85,11 @@ def checkerBoardBrush(size=32, color1=QColor(255, 255, 255), color2=QColor(220,
 
     size = s1+s2
 
+    cacheKey = f'pktk:checkerBoardBrush:{s1}:{s2}:{QColor(color1).rgba()}:{QColor(color2).rgba()}'
+    tmpPixmap = QPixmapCache.find(cacheKey)
+    if tmpPixmap is not None and not tmpPixmap.isNull():
+        return QBrush(tmpPixmap)
+
     tmpPixmap = QPixmap(size, size)
     tmpPixmap.fill(color1)
     brush = QBrush(color2)
@@ -78,6 +103,7 @@ def checkerBoardBrush(size=32, color1=QColor(255, 255, 255), color2=QColor(220,
     canvas.fillRect(QRect(s1, s1, s2, s2), brush)
     canvas.end()
 
+    QPixmapCache.insert(cacheKey, tmpPixmap)
     return QBrush(tmpPixmap)
 
 
@@ -89,21 +115,56 @@ def checkerBoardImage(size, checkerSize=32):
     if not isinstance(size, QSize):
         return None
 
-    pixmap = QPixmap(size)
-    painter = QPainter()
-    painter.begin(pixmap)
-    painter.fillRect(pixmap.rect(), checkerBoardBrush(checkerSize))
-    painter.end()
+    cacheKey = f'pktk:checkerBoardImage:{size.width()}x{size.height()}:{checkerSize}'
+    pixmap = QPixmapCache.find(cacheKey)
+    if pixmap is not None and not pixmap.isNull():
+        return pixmap
+
+    # build ARGB32 pixels buffer directly, with bytes repetitions only (same
+    # pattern than checkerBoardBrush() default colors, without painting)
+    width = size.width()
+    height = size.height()
+    s1 = checkerSize >> 1
+    s2 = max(1, checkerSize - s1)
+    tileSize = s1 + s2
+    rowSize = width * 4
+
+    pixel1 = struct.pack('=I', _CHECKERBOARD_COLOR1.rgba())
+    pixel2 = struct.pack('=I', _CHECKERBOARD_COLOR2.rgba())
+
+    nbTiles = width // tileSize + 1
+    rowA = ((pixel2 * s1 + pixel1 * s2) * nbTiles)[:rowSize]
+    rowB = ((pixel1 * s1 + pixel2 * s2) * nbTiles)[:rowSize]
+    data = ((rowA * s1 + rowB * s2) * (height // tileSize + 1))[:rowSize * height]
 
+    # QPixmap.fromImage() makes a copy of pixels data
+    pixmap = QPixmap.fromImage(QImage(data, width, height, rowSize, QImage.Format_ARGB32))
+
+    QPixmapCache.insert(cacheKey, pixmap)
     return pixmap
 
 
-def roundedPixmap(pixmap, radius=0.25, size=None):
+@lru_cache(maxsize=64, typed=True)
+def _resolveRadius(radius):
+    """Return a tuple (radius, Qt.SizeMode) to use with drawRoundedRect()
+
+    If `radius` is given as integer, radius size is absolute (given in pixels)
+    If `radius` is given as float, radius size is relative (given in percent)
+    """
+    if isinstance(radius, float):
+        # given as percent, then relative
+        return (radius * 100, Qt.RelativeSize)
+    return (radius, Qt.AbsoluteSize)
+
+
+def roundedPixmap(pixmap, radius=0.25, size=None, smooth=True):
     """return `pixmap` to given `size`, with rounded `radius`
 
     If `size` is None, use pixmap size
     If `radius` is given as integer, radius size is absolute (given in pixels)
     If `radius` is given as float, radius size is relative (given in percent)
+    If `smooth` is True, pixmap is scaled with a smooth transformation (if
+    needed), otherwise a fast transformation is used
    """
     if not isinstance(pixmap, QPixmap):
         raise EInvalidType('Given `pixmap` must be a <QPixmap>')
@@ -113,12 +174,18 @@ def roundedPixmap(pixmap, radius=0.25, size=None):
     if size is None:
         size = pixmap.size()
 
-    if isinstance(radius, float):
-        # given as percent, then relative
-        radius *= 100
-        radiusSizeMode = Qt.RelativeSize
-    else:
-        radiusSizeMode = Qt.AbsoluteSize
+    if size != pixmap.size():
+        if smooth:
+            pixmap = pixmap.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        else:
+            pixmap = pixmap.scaled(size, Qt.KeepAspectRatio, Qt.FastTransformation)
+
+    if radius == 0 and size == pixmap.size() and not pixmap.hasAlphaChannel():
+        # nothing to round, no empty area to fill and no transparent pixels to
+        # compose on rounded rect: no need to paint anything
+        return QPixmap(pixmap)
+
+    radius, radiusSizeMode = _resolveRadius(radius)
 
     workPixmap = QPixmap(size)
     workPixmap.fill(Qt.transparent)
@@ -129,10 +196,7 @@ def roundedPixmap(pixmap, radius=0.25, size=None):
     painter.setBrush(QBrush(Qt.black))
     painter.drawRoundedRect(0, 0, size.width(), size.height(), radius, radius, radiusSizeMode)
     painter.setCompositionMode(QPainter.CompositionMode_SourceAtop)
-    if size != pixmap.size():
-        painter.drawPixmap(0, 0, pixmap.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-    else:
-        painter.drawPixmap(0, 0, pixmap)
+    painter.drawPixmap(0, 0, pixmap)
 
     painter.end()
     return workPixmap
@@ -149,6 +213,11 @@ def bullet(size=16, color=QColor(255, 255, 255), shape='square', scaleShape=1.0,
     If `radius` is given as integer, radius size is absolute (given in pixels)
     If `radius` is given as float, radius size is relative (given in percent)
     """
+    cacheKey = f'pktk:bullet:{size}:{QColor(color).rgba()}:{shape}:{scaleShape}:{radius!r}'
+    pixmap = QPixmapCache.find(cacheKey)
+    if pixmap is not None and not pixmap.isNull():
+        return pixmap
+
     pixmap = QPixmap(size, size)
     pixmap.fill(Qt.transparent)
 
@@ -162,12 +231,7 @@ def bullet(size=16, color=QColor(255, 255, 255), shape='square', scaleShape=1.0,
     if shape == 'square':
         canvas.fillRect(QRectF(offset, offset, shapeWidth, shapeWidth), color)
     elif shape == 'roundSquare':
-        if isinstance(radius, float):
-            # given as percent, then relative
-            radius *= 100
-            radiusSizeMode = Qt.RelativeSize
-        else:
-            radiusSizeMode = Qt.AbsoluteSize
+        radius, radiusSizeMode = _resolveRadius(radius)
 
         canvas.setBrush(color)
         canvas.drawRoundedRect(QRectF(offset, offset, shapeWidth, shapeWidth), radius, radius, radiusSizeMode)
@@ -175,18 +239,24 @@ def bullet(size=16, color=QColor(255, 255, 255), shape='square', scaleShape=1.0,
         canvas.setBrush(color)
         canvas.drawEllipse(QRectF(offset, offset, shapeWidth, shapeWidth))
     else:
+        canvas.end()
         raise EInvalidValue("Given `shape` value is not valid")
 
     canvas.end()
+    QPixmapCache.insert(cacheKey, pixmap)
     return pixmap
 
 
 def paintOpaqueAsColor(pixmap, color):
     """From given pixmap, non transparent color are replaced with given color"""
-    if isinstance(pixmap, QPixmap):
+    if isinstance(pixmap, QPixmap) and not pixmap.isNull():
+        # SourceIn composition is applied by Qt's raster engine in a single
+        # fillRect() call; painter is ended explicitly to release paint engine
+        # immediately rather than on garbage collection
         painter = QPainter(pixmap)
         painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
         painter.fillRect(pixmap.rect(),  color)
+        painter.end()
     return pixmap
 
 
@@ -251,13 +321,44 @@ def buildIcon(icons, size=None):
             else:
                 returned.addFile(*tuple(iconListItem))
         return returned
-    elif isinstance(icons, str) and (rfind := re.match("pktk:(.*)", icons)):
+    elif isinstance(icons, str):
+        if isinstance(size, int):
+            width, height = size, size
+        elif isinstance(size, QSize):
+            width, height = size.width(), size.height()
+        else:
+            width, height = -1, -1
+
+        icon = _buildIconFromUri(icons, width, height)
+        if icon is not None:
+            # return a copy (implicitly shared) to ensure cached icon can't be modified
+            return QIcon(icon)
+
+    raise EInvalidType("Given `icons` must be a <str> or a <list> of <tuples>")
+
+
+@lru_cache(maxsize=512)
+def _buildIconFromUri(uri, width, height):
+    """Return a QIcon build from given "pktk:XXXX" or "krita:XXXX" `uri`
+
+    Return None if given `uri` is not valid
+
+    Results are cached, cache is cleared with resetBuildIconCache()
+    """
+    if rfind := _RE_PKTK_URI.match(uri):
         return buildIcon([(f':/pktk/images/normal/{rfind.groups()[0]}', QIcon.Normal),
-                          (f':/pktk/images/disabled/{rfind.groups()[0]}', QIcon.Disabled)], size)
-    elif isinstance(icons, str) and (rfind := re.match("krita:(.*)", icons)):
+                          (f':/pktk/images/disabled/{rfind.groups()[0]}', QIcon.Disabled)], QSize(width, height))
+    elif rfind := _RE_KRITA_URI.match(uri):
         return Krita.instance().icon(rfind.groups()[0])
-    else:
-        raise EInvalidType("Given `icons` must be a <str> or a <list> of <tuples>")
+    return None
+
+
+def resetBuildIconCache():
+    """Clear icons cached by buildIcon()
+
+    Needed when resources are reloaded (theme changed)
+    """
+    _buildIconFromUri.cache_clear()
 
 
 def getIconList(source=[]):
@@ -280,25 +381,42 @@ def getIconList(source=[]):
     if not (addPkTk | addKrita):
         raise EInvalidValue("Given `source` must be empty or contain at least 'pktk' or 'krita'")
 
-    returned = []
-    resIterator = QDirIterator(":", QDirIterator.Subdirectories)
+    return list(_iconList(addPkTk, addKrita))
 
-    while resIterator.hasNext():
-        resName = resIterator.filePath()
 
-        if addPkTk:
-            if name := re.search(r"^:/pktk/images/normal/(.+)$", resName):
-                returned.append(f'pktk:{name.groups()[0]}')
+@lru_cache(maxsize=4)
+def _iconList(addPkTk, addKrita):
+    """Return a sorted tuple of icon uri from resources
 
-        if addKrita:
-            if name := re.match(r"^:/(?:16_dark|dark)_(.*)\.svg$", resName):
-                returned.append(f'krita:{name.groups()[0]}')
+    Results are cached, cache is cleared with resetIconListCache()
+    """
+    resNames = []
+    resIterator = QDirIterator(":", QDirIterator.Subdirectories)
+    while resIterator.hasNext():
+        resNames.append(resIterator.next())
 
-        resIterator.next()
+    # a single regular expression is applied to resource names, match group
+    # define if resource is a pktk or a krita icon
+    returned = []
+    for resName in resNames:
+        if name := _RE_ICON_RES.match(resName):
+            if name['pktk'] is not None:
+                if addPkTk:
+                    returned.append(f"pktk:{name['pktk']}")
+            elif addKrita:
+                returned.append(f"krita:{name['krita']}")
 
     returned.sort()
 
-    return returned
+    return tuple(returned)
+
+
+def resetIconListCache():
+    """Clear icons list cached by getIconList()
+
+    Needed when resources are reloaded (theme changed)
+    """
+    _iconList.cache_clear()
 
 
 def qImageToPngQByteArray(image):
@@ -321,19 +439,49 @@ def imgBoxSize(imageSize, boxSize):
     if not isinstance(boxSize, QSize):
         raise EInvalidType("Given `boxSize` must be a <QSize>")
 
-    imageRatio = imageSize.width()/imageSize.height()
-    boxRatio = boxSize.width()/boxSize.height()
-
-    if boxRatio > imageRatio:
-        h = boxSize.height()
-        w = round(h*imageRatio)
+    imageWidth = imageSize.width()
+    imageHeight = imageSize.height()
+    boxWidth = boxSize.width()
+    boxHeight = boxSize.height()
+
+    if imageWidth == 0 or imageHeight == 0:
+        # nothing to fit
+        return QSize(0, 0)
+
+    # compare ratios and compute size with integers only:
+    #   boxWidth/boxHeight > imageWidth/imageHeight
+    #   <=> boxWidth*imageHeight > boxHeight*imageWidth
+    # and (2*a + b)//(2*b) is a/b rounded to nearest integer
+    if boxWidth*imageHeight > boxHeight*imageWidth:
+        h = boxHeight
+        w = (2*h*imageWidth + imageHeight)//(2*imageHeight)
     else:
-        w = boxSize.width()
-        h = round(w/imageRatio)
+        w = boxWidth
+        h = (2*w*imageHeight + imageWidth)//(2*imageWidth)
 
     return QSize(w, h)
 
 
+# combineChannels() memoryview item formats, according to bytes per channel
+_CHANNEL_ITEM_FORMATS = {
+        1: 'B',
+        2: 'H',
+        4: 'I',
+        8: 'Q'
+    }
+
+
+def _channelBytes(channel):
+    """Return given `channel` as a memoryview of bytes
+
+    Non contiguous memory views can't be cast, then they're copied first
+    """
+    channel = memoryview(channel)
+    if not channel.c_contiguous:
+        channel = memoryview(bytes(channel))
+    return channel.cast('B')
+
+
 def combineChannels(bytesPerChannel, *channels):
     """Combine given channels
 
@@ -361,24 +509,53 @@ def combineChannels(bytesPerChannel, *channels):
         elif channelSize != len(channel):
             raise EInvalidValue("All `channels` must have the same size")
 
-    channelCount = len(channels)
-    offsetTargetInc = channelCount*bytesPerChannel
-    targetSize = channelSize*offsetTargetInc
-    target = bytearray(targetSize)
+    if channelSize is None:
+        return bytearray()
 
-    channelNumber = 0
-    for channel in channels:
-        offsetTarget = channelNumber*bytesPerChannel
-        offsetSource = 0
-        for index in range(channelSize//bytesPerChannel):
-            target[offsetTarget] = channel[offsetSource]
-            offsetTarget += offsetTargetInc
-            offsetSource += bytesPerChannel
-        channelNumber += 1
+    channelCount = len(channels)
+    target = bytearray(channelSize*channelCount)
+
+    # use extended slices assignment rather than a per byte loop
+    if bytesPerChannel in _CHANNEL_ITEM_FORMATS and channelSize % bytesPerChannel == 0:
+        # a channel value can be seen as a single item (1, 2, 4 or 8 bytes):
+        # only one C-level strided copy per channel
+        itemFormat = _CHANNEL_ITEM_FORMATS[bytesPerChannel]
+        targetItems = memoryview(target).cast(itemFormat)
+        for channelNumber, channel in enumerate(channels):
+            targetItems[channelNumber::channelCount] = _channelBytes(channel).cast(itemFormat)
+    else:
+        # one C-level strided copy per byte of channel value
+        offsetTargetInc = channelCount*bytesPerChannel
+        for channelNumber, channel in enumerate(channels):
+            channel = _channelBytes(channel)
+            offsetTarget = channelNumber*bytesPerChannel
+            for byteNumber in range(bytesPerChannel):
+                target[offsetTarget + byteNumber::offsetTargetInc] = channel[byteNumber::bytesPerChannel]
 
     return target
 
 
+# convertSize() conversions, as (fromUnit, toUnit): (multiplier, divisor)
+# - 'px' conversions are made through 'in' and resolution
+_SIZE_CONVERSIONS = {
+        ('mm', 'cm'): (1, 10),
+        ('mm', 'in'): (1, 25.4),
+        ('cm', 'mm'): (10, 1),
+        ('cm', 'in'): (1, 2.54),
+        ('in', 'mm'): (25.4, 1),
+        ('in', 'cm'): (2.54, 1),
+        ('pt', 'mm'): (0.35277777777777775, 1),     # 25.4/72
+        ('pt', 'cm'): (0.035277777777777775, 1),    # 2.54/72
+        ('pt', 'in'): (1, 72)
+    }
+
+# convertSize() default number of decimals, according to target unit
+_SIZE_ROUND_DECIMALS = {
+        'in': 4,
+        'cm': 2
+    }
+
+
 def convertSize(value, fromUnit, toUnit, resolution, roundValue=None):
     """Return converted `value` from given `fromUnit` to `toUnit`, using given `resolution` (if unit conversion implies px)
 
@@ -398,65 +575,49 @@ def convertSize(value, fromUnit, toUnit, resolution, roundValue=None):
         in: 4
     """
     if roundValue is None:
-        if toUnit == 'in':
-            roundValue = 4
-        elif toUnit == 'cm':
-            roundValue = 2
-        else:
-            roundValue = 0
+        roundValue = _SIZE_ROUND_DECIMALS.get(toUnit, 0)
+
+    if fromUnit == toUnit:
+        return value
 
     if resolution == 0:
         # avoid division by zero
         resolution = 1.0
 
-    if fromUnit == 'mm':
-        if toUnit == 'cm':
-            return round(value/10, roundValue)
-        elif toUnit == 'in':
-            return round(value/25.4, roundValue)
-        elif toUnit == 'px':
-            return round(convertSize(value, fromUnit, 'in', resolution) * resolution, roundValue)
-    elif fromUnit == 'cm':
-        if toUnit == 'mm':
-            return round(value*10, roundValue)
-        elif toUnit == 'in':
-            return round(value/2.54, roundValue)
-        elif toUnit == 'px':
-            return round(convertSize(value, fromUnit, 'in', resolution) * resolution, roundValue)
-    elif fromUnit == 'in':
-        if toUnit == 'mm':
-            return round(value*25.4, roundValue)
-        elif toUnit == 'cm':
-            return round(value*2.54, roundValue)
-        elif toUnit == 'px':
-            return round(value * resolution, roundValue)
-    elif fromUnit == 'px':
-        if toUnit == 'mm':
-            return round(convertSize(value, fromUnit, 'in', resolution)*25.4, roundValue)
-        elif toUnit == 'cm':
-            return round(convertSize(value, fromUnit, 'in', resolution)*2.54, roundValue)
-        elif toUnit == 'in':
+    if fromUnit == 'px':
+        if toUnit == 'in':
             return round(value / resolution, roundValue)
-    elif fromUnit == 'pt':
-        if toUnit == 'mm':
-            return round(value * 0.35277777777777775, roundValue)   # 25.4/72
-        elif toUnit == 'cm':
-            return round(value * 0.035277777777777775, roundValue)  # 2.54/72
-        elif toUnit == 'in':
-            return round(value / 72, roundValue)
-        elif toUnit == 'px':
-            return round(resolution * convertSize(value, fromUnit, 'in', resolution)/72, roundValue)
-    # all other combination are not valid, return initial value
-    return value
+        conversion = _SIZE_CONVERSIONS.get(('in', toUnit))
+        if conversion is None:
+            return value
+        # through inches, rounded as a 'in' conversion
+        value = round(value / resolution, _SIZE_ROUND_DECIMALS['in'])
+        return round(value * conversion[0] / conversion[1], roundValue)
+    elif toUnit == 'px':
+        if fromUnit != 'in':
+            # through inches, rounded as a 'in' conversion
+            conversion = _SIZE_CONVERSIONS.get((fromUnit, 'in'))
+            if conversion is None:
+                return value
+            value = round(value * conversion[0] / conversion[1], _SIZE_ROUND_DECIMALS['in'])
+        return round(value * resolution, roundValue)
+
+    conversion = _SIZE_CONVERSIONS.get((fromUnit, toUnit))
+    if conversion is None:
+        # all other combination are not valid, return initial value
+        return value
+
+    return round(value * conversion[0] / conversion[1], roundValue)
 
 
 def megaPixels(value, roundDec=2):
     """return value (in pixels) as megapixels rounded to given number of decimal"""
-    if value is None or value == 0:
+    if not value:
         return ""
+    # -(-a // b) is ceil(a/b) without float division
     if value < 100000:
-        return f"{ceil(value/10000)/100:.0{roundDec}f}"
-    return f"{ceil(value/100000)/10:.0{roundDec}f}"
+        return f"{-(-value // 10000)/100:.{roundDec}f}"
+    return f"{-(-value // 100000)/10:.{roundDec}f}"
 
 
 def ratioOrientation(ratio):
@@ -473,6 +634,8 @@ def ratioOrientation(ratio):
 
 class QIconPickable(QIcon):
     """A QIcon class that is serializable from pickle"""
+    B64_PREFIX = 'qicon:b64='
+
     def __reduce__(self):
         return type(self), (), self.__getstate__()
 
@@ -490,16 +653,50 @@ class QIconPickable(QIcon):
         """Return a base64 string from current object"""
         returned = bytes(self.__getstate__().toBase64()).decode()
         if pktkFormat:
-            returned = f'qicon:b64={returned}'
+            returned = f'{QIconPickable.B64_PREFIX}{returned}'
 
         return returned
 
     def fromB64(self, value):
-        """Set from a base64 string"""
-        if b64 := re.search("^qicon:b64=(.*)", value):
-            value = b64.groups()[0]
+        """Set from a base64 string
+
+        Return current object
+        """
+        if value.startswith(QIconPickable.B64_PREFIX):
+            value = value[len(QIconPickable.B64_PREFIX):]
 
         self.__setstate__(QByteArray.fromBase64(value.encode()))
+        return self
+
+
+def _fileSignature(fileName):
+    """Return a tuple (modification time, size) for given `fileName`, or None if file can't be read"""
+    try:
+        fileStat = os.stat(fileName)
+    except OSError:
+        return None
+    return (fileStat.st_mtime_ns, fileStat.st_size)
+
+
+@lru_cache(maxsize=256)
+def _loadFileIcon(fileName, fileSignature, maxWidth, maxHeight):
+    """Return a QIconPickable loaded from given `fileName`
+
+    If `maxWidth` and `maxHeight` are greater than 0, image is scaled down to
+    fit in given size (if bigger)
+
+    Results are cached, to avoid decoding the same file many times; given
+    `fileSignature` (cf. _fileSignature()) ensure a file modified on disk is
+    loaded again
+    """
+    if maxWidth < 0 or maxHeight < 0:
+        return QIconPickable(fileName)
+
+    pixmap = QPixmap(fileName)
+    if pixmap.width() > maxWidth or pixmap.height() > maxHeight:
+        # scale only if given image is greater than expected size:
+        pixmap = pixmap.scaled(QSize(maxWidth, maxHeight), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return QIconPickable(pixmap)
 
 
 class QUriIcon(QObject):
@@ -542,18 +739,14 @@ class QUriIcon(QObject):
             return
         elif not isinstance(uri, str):
             raise EInvalidType('Given `uri` must be a <str> or <QUriIcon>')
-        elif re.match("^(pktk|krita):", uri):
+        elif _RE_URI_SCHEME.match(uri):
             loadIcon = QIconPickable(buildIcon(uri))
         else:
             # a file?
             if self.__maxSize is None:
-                loadIcon = QIconPickable(uri)
+                loadIcon = QIconPickable(_loadFileIcon(uri, _fileSignature(uri), -1, -1))
             else:
-                pixmap = QPixmap(uri)
-                if pixmap.width() > self.__maxSize.width() or pixmap.height() > self.__maxSize.height():
-                    # scale only if given image is greater than expected size:
-                    pixmap = pixmap.scaled(self.__maxSize, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                loadIcon = QIconPickable(pixmap)
+                loadIcon = QIconPickable(_loadFileIcon(uri, _fileSignature(uri), self.__maxSize.width(), self.__maxSize.height()))
 
         if isinstance(icon, QIcon) and isinstance(uri, str):
             # an icon is provided, use it
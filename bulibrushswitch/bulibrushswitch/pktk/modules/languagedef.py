@@ -28,6 +28,8 @@ from PyQt5.QtGui import QColor
 
 import re
 
+from functools import lru_cache
+
 from .tokenizer import (
             Token,
             TokenType,
@@ -40,21 +42,43 @@ from .uitheme import UITheme
 from ..pktk import *
 
 
+_HEX_COLOR_RE = re.compile(r'^#[a-f0-9]{6}$', re.IGNORECASE)
+_SPACES_RE = re.compile(r'(\s+)')
+
+
 class LanguageDef:
 
     SEP_PRIMARY_VALUE = '\x01'              # define bounds for <value> and cursor position
     SEP_SECONDARY_VALUE = '\x02'            # define bounds for other values
 
+    __TEXT_PROPOSAL_CACHE_SIZE = 128
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def __textProposalPattern(text):
+        """Return compiled regular expression used to search proposals for given `text`"""
+        # split() with a capturing group: spaces are at odd indexes
+        parts = _SPACES_RE.split(text)
+        return re.compile(''.join(r'\s+' if index % 2 else re.escape(part) for index, part in enumerate(parts))+'.*')
+
     def __init__(self, rules=[], tokenType=None):
         """Initialise language & styles"""
         if tokenType is not None:
             self.__tokenType = tokenType
-            self.__tokenTypeVars = [tt for tt in [getattr(self.__tokenType, tt) for tt in dir(self.__tokenType)] if isinstance(tt, self.__tokenType) and not callable(tt.value)]
+            self.__tokenTypeVars = [tt for tt in self.__tokenType.__members__.values() if isinstance(tt, self.__tokenType) and not callable(tt.value)]
         else:
             self.__tokenType = None
             self.__tokenTypeVars = []
+        # token types indexed by id (if more than one token type have the same id, keep the first one)
+        self.__tokenTypeById = {}
+        for tokenType in self.__tokenTypeVars:
+            self.__tokenTypeById.setdefault(tokenType.value[0], tokenType)
         self.__tokenizer = Tokenizer(rules)
         self.__tokenStyle = TokenStyle()
+        # getTextProposal() results, key = (text, full)
+        # cache is valid only for rules used to build it
+        self.__textProposalCache = {}
+        self.__textProposalRules = ()
 
     def __repr__(self):
         return f"<{self.__class__.name}({self.name()}, {self.extensions()})>"
@@ -93,44 +117,33 @@ class LanguageDef:
         """
         if isinstance(styles, list):
             # set token styles
+            setStyle = self.__tokenStyle.setStyle
             for style in styles:
-                self.__tokenStyle.setStyle(theme, *style)
+                setStyle(theme, *style)
         elif isinstance(styles, dict) and len(self.__tokenTypeVars):
             # need to parse dict content
             computedStyles = []
-            for tokenId in styles.keys():
+            for tokenId, tokenStyle in styles.items():
                 # loop on dictionary keys, assuming they are token type id
-                for tokenType in self.__tokenTypeVars:
-                    # lookup available token types for language definition
-                    if tokenType.value[0] == tokenId:
-                        # current entry in dictionnary match a token type, process it
-                        computedStyle = [tokenType]
-
-                        if 'fg' in styles[tokenId] and isinstance(styles[tokenId]['fg'], str) and re.search('^#[a-f0-9]{6}$', styles[tokenId]['fg'], re.I):
-                            computedStyle.append(QColor(styles[tokenId]['fg']))
-                        else:
-                            computedStyle.append(None)
-
-                        if 'bold' in styles[tokenId] and isinstance(styles[tokenId]['bold'], bool):
-                            computedStyle.append(styles[tokenId]['bold'])
-                        else:
-                            computedStyle.append(False)
-
-                        if 'italic' in styles[tokenId] and isinstance(styles[tokenId]['italic'], bool):
-                            computedStyle.append(styles[tokenId]['italic'])
-                        else:
-                            computedStyle.append(False)
-
-                        if 'bg' in styles[tokenId] and isinstance(styles[tokenId]['bg'], str) and re.search('^#[a-f0-9]{6}$', styles[tokenId]['fg'], re.I):
-                            computedStyle.append(QColor(styles[tokenId]['bg']))
-                        else:
-                            computedStyle.append(None)
-
-                        computedStyles.append(computedStyle)
-                        break
+                tokenType = self.__tokenTypeById.get(tokenId)
+                if tokenType is not None:
+                    # current entry in dictionnary match a token type, process it
+                    fg = tokenStyle.get('fg')
+                    bold = tokenStyle.get('bold')
+                    italic = tokenStyle.get('italic')
+                    bg = tokenStyle.get('bg')
+
+                    computedStyles.append([tokenType,
+                                           QColor(fg) if isinstance(fg, str) and _HEX_COLOR_RE.match(fg) else None,
+                                           bold if isinstance(bold, bool) else False,
+                                           italic if isinstance(italic, bool) else False,
+                                           QColor(bg) if isinstance(bg, str) and _HEX_COLOR_RE.match(bg) else None
+                                           ])
 
             # now we have all style ready to be set
-            self.setStyles(theme, computedStyles)
+            setStyle = self.__tokenStyle.setStyle
+            for style in computedStyles:
+                setStyle(theme, *style)
 
     def style(self, item):
         """Return style (from current theme) for given token and/or rule"""
@@ -169,14 +182,33 @@ class LanguageDef:
         if not isinstance(text, str):
             raise EInvalidType('Given `text` must be str')
 
-        rePattern = re.compile(re.escape(re.sub(r'\s+', '\x02', text)).replace('\x02', r'\s+')+'.*')
-        returned = []
-        for rule in self.__tokenizer.rules():
-            values = rule.matchText(rePattern, full)
-            if len(values) > 0:
-                returned += values
-        # return list without any duplicate values
-        return list(set(returned))
+        rules = tuple(self.__tokenizer.rules())
+        if rules != self.__textProposalRules:
+            # rules have been modified since cache has been built
+            self.__textProposalCache.clear()
+            self.__textProposalRules = rules
+
+        key = (text, full)
+        if key in self.__textProposalCache:
+            # move entry at the end of cache (most recently used)
+            proposals = self.__textProposalCache.pop(key)
+        else:
+            rePattern = LanguageDef.__textProposalPattern(text)
+            # use dict keys to remove duplicate values while keeping order
+            returned = {}
+            for rule in rules:
+                values = rule.matchText(rePattern, full)
+                if len(values) > 0:
+                    returned.update(dict.fromkeys(values))
+            proposals = list(returned)
+
+            if len(self.__textProposalCache) >= LanguageDef.__TEXT_PROPOSAL_CACHE_SIZE:
+                # remove least recently used entry
+                self.__textProposalCache.pop(next(iter(self.__textProposalCache)))
+
+        self.__textProposalCache[key] = proposals
+        # return a copy, cached list must not be modified by caller
+        return list(proposals)
 
 
 class LanguageDefXML(LanguageDef):
@@ -191,29 +223,37 @@ class LanguageDefXML(LanguageDef):
         VALUE =         ('value', 'A VALUE value')
         SPECIALCHAR =   ('special_character', 'A SPECIAL CHARACTER value')
 
+    # tokenizer rules, built on first instantiation
+    __RULES = None
+
+    @staticmethod
+    def __rules():
+        """Return tokenizer rules for language"""
+        if LanguageDefXML.__RULES is None:
+            LanguageDefXML.__RULES = (
+                TokenizerRule(LanguageDefXML.ITokenType.COMMENT,
+                              r'<!--(.*?)-->',
+                              multiLineStart=r'<!--',
+                              multiLineEnd=r'-->'),
+                TokenizerRule(LanguageDefXML.ITokenType.CDATA,
+                              r'<!\[CDATA\[.*\]\]>',
+                              multiLineStart=r'<!\[CDATA\[',
+                              multiLineEnd=r'\]\]>'),
+                TokenizerRule(LanguageDefXML.ITokenType.STRING, r'''(?:"[^"\\]*(?:\\.[^"\\]*)*"|'[^'\\]*(?:\\.[^'\\]*)*')'''),
+                TokenizerRule(LanguageDefXML.ITokenType.MARKUP, r'<(?:\?xml|!DOCTYPE|!ELEMENT|\w[\w:-]*\b)'),
+                TokenizerRule(LanguageDefXML.ITokenType.MARKUP, r'</\w[\w:-]*>'),
+                TokenizerRule(LanguageDefXML.ITokenType.MARKUP, r'/?>|\?>'),
+                TokenizerRule(LanguageDefXML.ITokenType.ATTRIBUTE, r'(?<=<[^>]*)\b\w[\w:-]*'),
+                TokenizerRule(LanguageDefXML.ITokenType.ATTRIBUTE, r'\b\w[\w:-]*(?=\s*=)'),
+                TokenizerRule(LanguageDefXML.ITokenType.SPECIALCHAR, r'&(?:amp|gt|lt|quot|apos|#\d+|#x[a-fA-F0-9]+);'),
+                TokenizerRule(LanguageDefXML.ITokenType.SETATTR, r'='),
+                TokenizerRule(LanguageDefXML.ITokenType.SPACE, r'\s+'),
+                TokenizerRule(LanguageDefXML.ITokenType.VALUE, r'''[^<>'"&]*'''),
+                )
+        return LanguageDefXML.__RULES
+
     def __init__(self):
-        super(LanguageDefXML, self).__init__([
-            TokenizerRule(LanguageDefXML.ITokenType.COMMENT,
-                          r'<!--(.*?)-->',
-                          multiLineStart=r'<!--',
-                          multiLineEnd=r'-->'),
-            TokenizerRule(LanguageDefXML.ITokenType.CDATA,
-                          r'<!\[CDATA\[.*\]\]>',
-                          multiLineStart=r'<!\[CDATA\[',
-                          multiLineEnd=r'\]\]>'),
-            TokenizerRule(LanguageDefXML.ITokenType.STRING, r'"[^"\\]*(?:\\.[^"\\]*)*"'),
-            TokenizerRule(LanguageDefXML.ITokenType.STRING, r"'[^'\\]*(?:\\.[^'\\]*)*'"),
-            TokenizerRule(LanguageDefXML.ITokenType.MARKUP, r'<(?:\?xml|!DOCTYPE|!ELEMENT|\w[\w:-]*\b)'),
-            TokenizerRule(LanguageDefXML.ITokenType.MARKUP, r'</\w[\w:-]*>'),
-            TokenizerRule(LanguageDefXML.ITokenType.MARKUP, r'/?>|\?>'),
-            TokenizerRule(LanguageDefXML.ITokenType.ATTRIBUTE, r'(?<=<[^>]*)\b\w[\w:-]*'),
-            TokenizerRule(LanguageDefXML.ITokenType.ATTRIBUTE, r'\b\w[\w:-]*(?=\s*=)'),
-            TokenizerRule(LanguageDefXML.ITokenType.SPECIALCHAR, r'&(?:amp|gt|lt|quot|apos|#\d+|#x[a-fA-F0-9]+);'),
-            TokenizerRule(LanguageDefXML.ITokenType.SETATTR, r'='),
-            TokenizerRule(LanguageDefXML.ITokenType.SPACE, r'\s+'),
-            TokenizerRule(LanguageDefXML.ITokenType.VALUE, r'''[^<>'"&]*'''),
-            ],
-            LanguageDefXML.ITokenType)
+        super(LanguageDefXML, self).__init__(list(LanguageDefXML.__rules()), LanguageDefXML.ITokenType)
 
         self.setStyles(UITheme.DARK_THEME, [
             (LanguageDefXML.ITokenType.STRING, '#98c379', False, False),
@@ -260,28 +300,37 @@ class LanguageDefJSON(LanguageDef):
         NUMBER =            ('value_number', 'A NUMBER value')
         SPECIAL_VALUE =     ('value_special', 'A special value')
 
+    # tokenizer rules, built on first instantiation
+    __RULES = None
+
+    @staticmethod
+    def __rules():
+        """Return tokenizer rules for language"""
+        if LanguageDefJSON.__RULES is None:
+            LanguageDefJSON.__RULES = (
+                TokenizerRule(LanguageDefJSON.ITokenType.OBJECT_ID, r'"[^"\\]*(?:\\.[^"\\]*)*"(?=\s*:)'),
+                TokenizerRule(LanguageDefJSON.ITokenType.STRING, r'"[^"\\]*(?:\\.[^"\\]*)*"'),
+                TokenizerRule(LanguageDefJSON.ITokenType.NUMBER,
+                              # float
+                              r"-?(?:0\.|[1-9](?:\d*)\.)\d+(?:e[+-]?\d+)?",
+                              caseInsensitive=True),
+                TokenizerRule(LanguageDefJSON.ITokenType.NUMBER,
+                              # integer
+                              r"-?(?:[1-9]\d*)(?:e[+-]?\d+)?",
+                              caseInsensitive=True),
+                TokenizerRule(LanguageDefJSON.ITokenType.OBJECT_DEFINITION, r':'),
+                TokenizerRule(LanguageDefJSON.ITokenType.OBJECT_SEPARATOR, r','),
+                TokenizerRule(LanguageDefJSON.ITokenType.SPECIAL_VALUE, r'(?:true|false|null)'),
+                TokenizerRule(LanguageDefJSON.ITokenType.OBJECT_MARKER_S, r'\{'),
+                TokenizerRule(LanguageDefJSON.ITokenType.OBJECT_MARKER_E, r'\}'),
+                TokenizerRule(LanguageDefJSON.ITokenType.ARRAY_MARKER_S, r'(?:\[)'),
+                TokenizerRule(LanguageDefJSON.ITokenType.ARRAY_MARKER_E, r'(?:\])'),
+                TokenizerRule(LanguageDefJSON.ITokenType.SPACE, r'\s+')
+                )
+        return LanguageDefJSON.__RULES
+
     def __init__(self):
-        super(LanguageDefJSON, self).__init__([
-            TokenizerRule(LanguageDefJSON.ITokenType.OBJECT_ID, r'"[^"\\]*(?:\\.[^"\\]*)*"(?=\s*:)'),
-            TokenizerRule(LanguageDefJSON.ITokenType.STRING, r'"[^"\\]*(?:\\.[^"\\]*)*"'),
-            TokenizerRule(LanguageDefJSON.ITokenType.NUMBER,
-                          # float
-                          r"-?(?:0\.|[1-9](?:\d*)\.)\d+(?:e[+-]?\d+)?",
-                          caseInsensitive=True),
-            TokenizerRule(LanguageDefJSON.ITokenType.NUMBER,
-                          # integer
-                          r"-?(?:[1-9]\d*)(?:e[+-]?\d+)?",
-                          caseInsensitive=True),
-            TokenizerRule(LanguageDefJSON.ITokenType.OBJECT_DEFINITION, r':'),
-            TokenizerRule(LanguageDefJSON.ITokenType.OBJECT_SEPARATOR, r','),
-            TokenizerRule(LanguageDefJSON.ITokenType.SPECIAL_VALUE, r'(?:true|false|null)'),
-            TokenizerRule(LanguageDefJSON.ITokenType.OBJECT_MARKER_S, r'\{'),
-            TokenizerRule(LanguageDefJSON.ITokenType.OBJECT_MARKER_E, r'\}'),
-            TokenizerRule(LanguageDefJSON.ITokenType.ARRAY_MARKER_S, r'(?:\[)'),
-            TokenizerRule(LanguageDefJSON.ITokenType.ARRAY_MARKER_E, r'(?:\])'),
-            TokenizerRule(LanguageDefJSON.ITokenType.SPACE, r'\s+')
-            ],
-            LanguageDefJSON.ITokenType)
+        super(LanguageDefJSON, self).__init__(list(LanguageDefJSON.__rules()), LanguageDefJSON.ITokenType)
 
         self.setStyles(UITheme.DARK_THEME, [
             (LanguageDefJSON.ITokenType.OBJECT_ID, '#79c3cc', True, False),
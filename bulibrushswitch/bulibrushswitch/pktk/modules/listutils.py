@@ -23,6 +23,11 @@ EXTRASELECTION_FILTER_REMOVE =  0x0002
 EXTRASELECTION_FILTER_FCTTRUE = 0x0003
 
 
+def _extraSelectionKey(extraSelection, userProperty=QTextFormat.UserProperty):
+    """Sort key for sortExtraSelections()"""
+    return extraSelection.format.property(userProperty) or 0xFFFFFFFF
+
+
 def flatten(items):
     """Return a flatten list whatever the number of nested level the list have
 
@@ -30,12 +35,19 @@ def flatten(items):
 
     f: [1,2,3,4,5,6,7,8,9,10]
     """
+    # walk nested lists with a stack of iterators rather than with recursive calls
     returned = []
-    for item in items:
-        if isinstance(item, (list, tuple)):
-            returned.extend(flatten(item))
-        else:
+    stack = [iter(items)]
+    while stack:
+        for item in stack[-1]:
+            if isinstance(item, (list, tuple)):
+                # process nested items before next items
+                stack.append(iter(item))
+                break
             returned.append(item)
+        else:
+            # all items from current level have been processed
+            stack.pop()
     return returned
 
 
@@ -54,11 +66,19 @@ def rotate(items, shiftValue=1):
     x=rotate(l, -1)
     x: [2,3,4,1]
 
+    Note: when there's no rotation to apply (empty list, or `shiftValue` is a
+          multiple of list length), given `items` list is returned, not a copy
     """
-    shiftValue = shiftValue % len(items)
+    nbItems = len(items)
+    if nbItems == 0:
+        # nothing to rotate...
+        return items
+
+    shiftValue = shiftValue % nbItems
     if shiftValue == 0:
         # no rotation...
         return items
+
     # do rotation
     return items[-shiftValue:] + items[:-shiftValue]
 
@@ -69,8 +89,13 @@ def unique(items):
     Initial order list is preserved
     Note: works with non-hashable object
     """
-    # a faster method could be return list(set(items))
-    # but it doesn't work with non-hashable object (like a QColor for example)
+    try:
+        # fast method, dict keys preserve insertion order
+        return list(dict.fromkeys(items))
+    except TypeError:
+        # doesn't work with non-hashable object (like a QColor for example)
+        pass
+
     returned = []
     for item in items:
         if item not in returned:
@@ -86,14 +111,9 @@ def sortExtraSelections(extraSelection):
     2) items without format.property(QTextFormat.UserProperty)
        - no special order, just set 'after items with property QTextFormat.UserProperty'
     """
-    def checkType(value):
-        returned = value.format.property(QTextFormat.UserProperty)
-        if returned:
-            return returned
-        return 0xFFFFFFFF
     if not isinstance(extraSelection, list):
         raise EInvalidType('Given `extraSelection` must be a <list>')
-    extraSelection.sort(key=checkType)
+    extraSelection.sort(key=_extraSelectionKey)
 
 
 def filterExtraSelections(extraSelection, filterValue, filterRule=EXTRASELECTION_FILTER_KEEP, filterProperty=QTextFormat.UserProperty, sortResult=False, stopOnFirst=False, removed=[]):
@@ -128,26 +148,38 @@ def filterExtraSelections(extraSelection, filterValue, filterRule=EXTRASELECTION
         if not callable(filterValue):
             raise EInvalidType("Given `filterValue` must be a callable when `filterRule` is set to EXTRASELECTION_FILTER_FCTTRUE")
 
-        index = len(extraSelection) - 1
-        while index >= 0:
-            if filterValue(extraSelection[index]) is False:
-                removed.append(extraSelection.pop(index))
-                if stopOnFirst:
-                    return
-            index -= 1
+        def isRemoved(item):
+            return filterValue(item) is False
     elif filterRule == EXTRASELECTION_FILTER_KEEP:
-        index = len(extraSelection) - 1
-        while index >= 0:
-            if extraSelection[index].format.property(filterProperty) != filterValue:
-                removed.append(extraSelection.pop(index))
-                if stopOnFirst:
-                    return
-            index -= 1
+        def isRemoved(item):
+            return item.format.property(filterProperty) != filterValue
     elif filterRule == EXTRASELECTION_FILTER_REMOVE:
-        index = len(extraSelection) - 1
-        while index >= 0:
-            if extraSelection[index].format.property(filterProperty) == filterValue:
+        def isRemoved(item):
+            return item.format.property(filterProperty) == filterValue
+    else:
+        return
+
+    if stopOnFirst:
+        # only one item to remove, searched from last item; no need to rebuild list
+        for index in range(len(extraSelection) - 1, -1, -1):
+            if isRemoved(extraSelection[index]):
                 removed.append(extraSelection.pop(index))
-                if stopOnFirst:
-                    return
-            index -= 1
+                return
+        return
+
+    # single forward pass: items are dispatched in kept/removed lists, and
+    # given list is updated once at the end rather than with a pop() per
+    # removed item (that shift all following items)
+    kept = []
+    keptAppend = kept.append
+    removedAppend = removed.append
+    for item in extraSelection:
+        if isRemoved(item):
+            removedAppend(item)
+        else:
+            keptAppend(item)
+
+    if removed:
+        extraSelection[:] = kept
+        # removed items are returned from last to first one
+        removed.reverse()
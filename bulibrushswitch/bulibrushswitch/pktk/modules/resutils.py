@@ -37,6 +37,8 @@
 # -----------------------------------------------------------------------------
 
 from enum import Enum
+from collections import OrderedDict
+import json
 import os.path
 import sys
 
@@ -47,6 +49,7 @@ from PyQt5.QtGui import (
         QPixmap,
         QIcon,
         QImage,
+        QBrush,
         QPainter
     )
 from PyQt5.QtCore import (
@@ -54,8 +57,9 @@ from PyQt5.QtCore import (
     )
 from PyQt5.QtSql import (QSqlDatabase, QSqlQuery)
 
-from .imgutils import checkerBoardImage
+from .imgutils import (checkerBoardImage, checkerBoardBrush)
 from .iconsizes import IconSizes
+from .workers import WorkerPool
 from ..pktk import *
 
 
@@ -67,20 +71,35 @@ class ManagedResourceTypes(Enum):
     RES_PATTERNS = "pattern"
 
     def label(self,  **param):
-        match self:
-            case ManagedResourceTypes.RES_GRADIENTS:
-                return i18n('Gradients')
-            case ManagedResourceTypes.RES_PRESETS:
-                return i18n('Presets')
-            case ManagedResourceTypes.RES_PALETTES:
-                return i18n('Palettes')
-            case ManagedResourceTypes.RES_PATTERNS:
-                return i18n('Patterns')
-        return self.value
+        # labels are translated on each call
+        return _MANAGED_RESOURCE_TYPES_LABELS[self]()
+
+
+# can't be defined in ManagedResourceTypes class, otherwise would be an enum member
+_MANAGED_RESOURCE_TYPES_LABELS = {
+        ManagedResourceTypes.RES_GRADIENTS: lambda: i18n('Gradients'),
+        ManagedResourceTypes.RES_PRESETS: lambda: i18n('Presets'),
+        ManagedResourceTypes.RES_PALETTES: lambda: i18n('Palettes'),
+        ManagedResourceTypes.RES_PATTERNS: lambda: i18n('Patterns')
+    }
 
 
 class ManagedResource(object):
     """A managed resource item"""
+    __slots__ = ('__id',
+                 '__name',
+                 '__fileName',
+                 '__tooltip',
+                 '__thumbnail',
+                 '__originalImgSize',
+                 '__tags',
+                 '__tagsId',
+                 '__resource',
+                 '__type',
+                 '__storageLocation',
+                 '__storageTypeId',
+                 '__storageActive',
+                 '__tooltipHtml')
 
     def __init__(self, value=None):
         """Given `value` can be a resource or a dict"""
@@ -115,13 +134,16 @@ class ManagedResource(object):
         self.__type = None
 
         # resource storage location
-        self.__location = ''
+        self.__storageLocation = ''
 
         # resource storage type
         self.__storageTypeId = 0
 
         # resource storage active
-        self.__active = False
+        self.__storageActive = False
+
+        # formatted tooltip (html), built on first call to tooltipHtml()
+        self.__tooltipHtml = None
 
         if isinstance(value, ManagedResource):
             self.__id = value.id()
@@ -204,6 +226,30 @@ class ManagedResource(object):
             else:
                 raise EInvalidType("Given `storageActive` must be provided as a <bool>")
 
+    @classmethod
+    def fromRow(cls, resourceId, name, fileName, tooltip, thumbnail, originalImgSize, tags, resource, resourceType, storageLocation, storageTypeId, storageActive):
+        """Return a managed resource built from given values
+
+        Values are not checked: method is intended to be used with trusted values
+        only (resources read from database)
+        """
+        returned = cls.__new__(cls)
+        returned.__id = resourceId
+        returned.__name = name
+        returned.__fileName = fileName
+        returned.__tooltip = tooltip
+        returned.__thumbnail = thumbnail
+        returned.__originalImgSize = originalImgSize
+        returned.__tags = tags
+        returned.__tagsId = [tag[0] for tag in tags]
+        returned.__resource = resource
+        returned.__type = resourceType
+        returned.__storageLocation = storageLocation
+        returned.__storageTypeId = storageTypeId
+        returned.__storageActive = storageActive
+        returned.__tooltipHtml = None
+        return returned
+
     def __repr__(self):
         if self.__type is None:
             return f"<ManagedResource({self.__id}, '{self.__name}', '{self.__fileName}', 'None')>"
@@ -211,7 +257,11 @@ class ManagedResource(object):
             return f"<ManagedResource({self.__id}, '{self.__name}', '{self.__fileName}', '{self.__type.value}')>"
 
     def __eq__(self, other):
-        return other is not None and self.__type == other.__type and self.__id == other.__id
+        return isinstance(other, ManagedResource) and self.__type == other.__type and self.__id == other.__id
+
+    def __hash__(self):
+        # consistent with __eq__(): resources can be used as dictionary keys or in sets
+        return hash((self.__type, self.__id))
 
     def id(self):
         """return internal Krita's resource Id"""
@@ -229,6 +279,29 @@ class ManagedResource(object):
         """return resource tooltip"""
         return self.__tooltip
 
+    def tooltipHtml(self):
+        """return resource tooltip formatted as html, with tags and pattern size
+
+        Formatted tooltip is built once and then reused
+        """
+        if self.__tooltipHtml is None:
+            txtTag = ''
+            txtImg = ''
+            if len(self.__tags) > 0:
+                if len(self.__tags) == 1:
+                    tag = i18n('Tag')
+                    tags = self.__tags[0][1]
+                else:
+                    tag = i18n('Tags')
+                    tags = "</li><li>".join([tagProperty[1] for tagProperty in self.__tags])
+                txtTag = f"<hr><b>{tag} ({len(self.__tags)})</b><ul><li>{tags}</li></ul>"
+
+            if self.__type == ManagedResourceTypes.RES_PATTERNS:
+                txtImg = f"<hr><b>{i18n('Pattern size')}</b> {self.__originalImgSize.width()}x{self.__originalImgSize.height()}"
+
+            self.__tooltipHtml = f"{self.__tooltip}{txtImg}{txtTag}"
+        return self.__tooltipHtml
+
     def thumbnail(self):
         """return resource thumbnail as a QPixmap
         (or None if is empty resource)
@@ -285,6 +358,21 @@ class DBManagedResources(QObject):
     """
     __DBINSTANCEID = "PKTK_DBManagedResources"
 
+    # connection settings for read only queries:
+    # - larger page cache (20MB) and memory mapped I/O (256MB)
+    # - temporary b-trees (GROUP BY/ORDER BY) kept in memory
+    # - ensure nothing can be written through connection
+    __PRAGMAS = ('PRAGMA cache_size = -20000',
+                 'PRAGMA mmap_size = 268435456',
+                 'PRAGMA temp_store = MEMORY',
+                 'PRAGMA query_only = 1')
+
+    # resource types names in database
+    __RESOURCE_TYPES = {ManagedResourceTypes.RES_GRADIENTS: 'gradients',
+                        ManagedResourceTypes.RES_PRESETS: 'paintoppresets',
+                        ManagedResourceTypes.RES_PALETTES: 'palettes',
+                        ManagedResourceTypes.RES_PATTERNS: 'patterns'}
+
     def __init__(self, fileName, parent=None):
         super(DBManagedResources, self).__init__(parent)
         self.__dbInstanceId = f"{DBManagedResources.__DBINSTANCEID}_{QUuid.createUuid().toString()}"
@@ -292,6 +380,11 @@ class DBManagedResources(QObject):
         self.__databaseInstance = None
         self.__includeStorageInactive = False
         self.__includeDuplicateResources = False
+        self.__jsonSupported = False
+        self.__windowFunctionsSupported = False
+        self.__dbQuery = None
+        self.__dbTagsQuery = None
+        self.__dbFieldIdx = None
         self.setDatabaseFile(fileName)
 
     def __del__(self):
@@ -307,14 +400,55 @@ class DBManagedResources(QObject):
         # - return duplicates resources if self.__includeDuplicateResources is True
         # - return from deactived storages if self.__includeStorageInactive is True
         # Resources are filtered in second time, if needed
+        #
+        # When supported, resources are pre-filtered on names and file names
+        # given as a JSON object {name: fileName} through :resources binding
+        # value
+        #
+        # Tags are returned by a dedicated query
+        #
+        # Storage properties are returned from resource with lowest Id when
+        # duplicates are not returned (SQLite returns bare columns from row
+        # matching min() aggregate)
         modelQuery = """
+            -- select resources according to option __includeDuplicateResources and __includeStorageInactive
+            SELECT {},
+                   r.name,
+                   r.filename AS "fileName",
+                   r.tooltip,
+                   r.md5sum,
+                   s.location AS "storageLocation",
+                   s.storage_type_id AS "storageTypeId",
+                   s.active AS "storageActive"
+            FROM resources r
+                -- need to reduce resources from ACTIVE storages only
+                JOIN storages s
+                  ON s.id = r.storage_id
+                 {}
+                -- reduce resources list to expected resource type
+                JOIN resource_types rty
+                  ON r.resource_type_id = rty.id
+                 AND rty.name = :rtype
+            {}
+            GROUP BY r.md5sum,
+                     {}
+                     r.name,
+                     r.fileName,
+                     r.tooltip
+            ORDER BY r.name,
+                     "id"
+            """
+
+        # Return tags (tag id, tag name) of resources, sorted by tag name
+        # - for each resource, 'resourceId' is the id returned by resources query
+        #   (if duplicates resources are not returned, tags from all duplicates
+        #   are returned for the resource with lowest id)
+        tagsQuery = """
             WITH filteredResources AS (
                 -- select resources according to option __includeDuplicateResources and __includeStorageInactive
-                SELECT {},
-                       r.name,
-                       r.filename as "fileName",
-                       r.tooltip,
-                       rtrim(replace(group_concat(DISTINCT cast(t.id as text) || '\v' || t.name || '\t'), '\t,', '\t'), '\t') as "tagsId"
+                SELECT r.id,
+                       r.resource_type_id,
+                       {} AS "resourceId"
                 FROM resources r
                     -- need to reduce resources from ACTIVE storages only
                     JOIN storages s
@@ -323,76 +457,73 @@ class DBManagedResources(QObject):
                     -- reduce resources list to expected resource type
                     JOIN resource_types rty
                       ON r.resource_type_id = rty.id
-                     AND rty.name = '{}'
-                    -- get tags
-                    LEFT OUTER JOIN resource_tags rta
-                      ON rta.active = 1
-                     AND rta.resource_id = r.id
-                    LEFT JOIN tags t
-                      ON t.resource_type_id = r.resource_type_id
-                     AND t.id = rta.tag_id
-                     AND t.active = 1
-                GROUP BY r.md5sum,
-                         {}
-                         r.name,
-                         r.fileName,
-                         r.tooltip
-                ORDER BY r.name,
-                         r.id
+                     AND rty.name = :rtype
+                {}
             )
-            -- return resources properties, using filtered resource view
-            SELECT fr.id,
-                   fr.name,
-                   fr.fileName,
-                   fr.tooltip,
-                   fr.tagsId,
-                   s.location AS "storageLocation",
-                   s.storage_type_id AS "storageTypeId",
-                   s.active AS "storageActive"
+            SELECT DISTINCT fr.resourceId,
+                   t.id,
+                   t.name
             FROM filteredResources AS fr
-                 JOIN resources r
-                   ON r.id = fr.id
-                 JOIN storages AS s
-                   ON s.id = r.storage_id
-            ORDER BY r.name,
-                     r.id
+                 JOIN resource_tags rta
+                   ON rta.active = 1
+                  AND rta.resource_id = fr.id
+                 JOIN tags t
+                   ON t.resource_type_id = fr.resource_type_id
+                  AND t.id = rta.tag_id
+                  AND t.active = 1
+            ORDER BY t.name
             """
 
         if self.__includeDuplicateResources:
-            includeDuplicateResources = 'r.id'
+            includeDuplicateResources = 'r.id AS "id"'
             includeDuplicateResourcesGB = 'r.id,'
+            includeDuplicateResourcesTags = 'r.id'
         else:
             includeDuplicateResources = 'min(r.id) as "id"'
             includeDuplicateResourcesGB = ''
+            if self.__windowFunctionsSupported:
+                includeDuplicateResourcesTags = 'min(r.id) OVER (PARTITION BY r.md5sum, r.name, r.filename, r.tooltip)'
+            else:
+                # same grouping, through a subquery
+                includeDuplicateResourcesTags = f"""(SELECT min(r2.id)
+                        FROM resources r2
+                            JOIN storages s2
+                              ON s2.id = r2.storage_id
+                             {'' if self.__includeStorageInactive else 'AND s2.active = 1'}
+                        WHERE r2.resource_type_id = r.resource_type_id
+                          AND r2.md5sum IS r.md5sum
+                          AND r2.name IS r.name
+                          AND r2.filename IS r.filename
+                          AND r2.tooltip IS r.tooltip)"""
 
         if self.__includeStorageInactive:
             includeStorageInactive = ''
         else:
             includeStorageInactive = 'AND s.active = 1'
 
-        self.__dbQueries[ManagedResourceTypes.RES_GRADIENTS] = QSqlQuery(self.__databaseInstance)
-        self.__dbQueries[ManagedResourceTypes.RES_GRADIENTS].prepare(modelQuery.format(includeDuplicateResources,
-                                                                                       includeStorageInactive,
-                                                                                       'gradients',
-                                                                                       includeDuplicateResourcesGB))
-
-        self.__dbQueries[ManagedResourceTypes.RES_PRESETS] = QSqlQuery(self.__databaseInstance)
-        self.__dbQueries[ManagedResourceTypes.RES_PRESETS].prepare(modelQuery.format(includeDuplicateResources,
-                                                                                     includeStorageInactive,
-                                                                                     'paintoppresets',
-                                                                                     includeDuplicateResourcesGB))
-
-        self.__dbQueries[ManagedResourceTypes.RES_PALETTES] = QSqlQuery(self.__databaseInstance)
-        self.__dbQueries[ManagedResourceTypes.RES_PALETTES].prepare(modelQuery.format(includeDuplicateResources,
-                                                                                      includeStorageInactive,
-                                                                                      'palettes',
-                                                                                      includeDuplicateResourcesGB))
-
-        self.__dbQueries[ManagedResourceTypes.RES_PATTERNS] = QSqlQuery(self.__databaseInstance)
-        self.__dbQueries[ManagedResourceTypes.RES_PATTERNS].prepare(modelQuery.format(includeDuplicateResources,
-                                                                                      includeStorageInactive,
-                                                                                      'patterns',
-                                                                                      includeDuplicateResourcesGB))
+        if self.__jsonSupported:
+            filterResources = """-- reduce resources list to expected names & file names
+                    JOIN json_each(:resources) AS w
+                      ON w.key = r.name
+                     AND w.value = r.filename"""
+        else:
+            filterResources = ''
+
+        # columns indexes are resolved on first execution of prepared query
+        self.__dbFieldIdx = None
+
+        # same queries are used for all resources types, resource type name
+        # is bound through :rtype binding value on execution
+        self.__dbQuery = QSqlQuery(self.__databaseInstance)
+        self.__dbQuery.prepare(modelQuery.format(includeDuplicateResources,
+                                                 includeStorageInactive,
+                                                 filterResources,
+                                                 includeDuplicateResourcesGB))
+
+        self.__dbTagsQuery = QSqlQuery(self.__databaseInstance)
+        self.__dbTagsQuery.prepare(tagsQuery.format(includeDuplicateResourcesTags,
+                                                    includeStorageInactive,
+                                                    filterResources))
 
     def databaseFile(self):
         """Return current database file name
@@ -420,9 +551,20 @@ class DBManagedResources(QObject):
             self.__databaseInstance.setConnectOptions("QSQLITE_BUSY_TIMEOUT=25;QSQLITE_OPEN_READONLY=1")
 
             # reset precompiled queries
-            self.__dbQueries = {}
+            self.__dbQuery = None
+            self.__dbTagsQuery = None
+            self.__dbFieldIdx = None
 
             if self.__databaseInstance.open():
+                # an unsupported pragma is just ignored
+                query = QSqlQuery(self.__databaseInstance)
+                for pragma in DBManagedResources.__PRAGMAS:
+                    query.exec(pragma)
+
+                # JSON functions are used to filter resources names, if available
+                self.__jsonSupported = QSqlQuery("SELECT json_valid('[]')", self.__databaseInstance).isActive()
+                # window functions (SQLite 3.25+) are used to group tags of duplicates resources, if available
+                self.__windowFunctionsSupported = QSqlQuery("SELECT min(1) OVER ()", self.__databaseInstance).isActive()
                 self.__initializeQueries()
                 return True
             else:
@@ -440,6 +582,17 @@ class DBManagedResources(QObject):
             self.__databaseInstance = None
             QSqlDatabase.removeDatabase(self.__dbInstanceId)
 
+    def __executeQuery(self, query, queryId, bindValues):
+        """Bind resource type name for `queryId` and given values to prepared `query` and execute it"""
+        query.bindValue(':rtype', DBManagedResources.__RESOURCE_TYPES[queryId])
+
+        # bind values if any
+        for bindKey in bindValues.keys():
+            query.bindValue(bindKey, bindValues[bindKey])
+
+        # execute query
+        return (query.exec(), query)
+
     def executeQuery(self, queryId, bindValues={}):
         """Execute query by Id
 
@@ -451,15 +604,33 @@ class DBManagedResources(QObject):
             If query id is not valid or database is not opened: (None, None)
         """
         if self.__databaseInstance is not None and isinstance(queryId, ManagedResourceTypes):
-            # get prepared query
-            query = self.__dbQueries[queryId]
+            returned = self.__executeQuery(self.__dbQuery, queryId, bindValues)
+            if returned[0] and self.__dbFieldIdx is None:
+                # record is only available once query has been executed
+                record = returned[1].record()
+                self.__dbFieldIdx = {record.fieldName(index): index for index in range(record.count())}
+            return returned
+
+        return (None, None)
 
-            # bind values if any
-            for bindKey in bindValues.keys():
-                query.bindValue(bindKey, bindValues[bindKey])
+    def fieldIndex(self, queryId, columnName):
+        """Return index of column `columnName` in rows returned by query `queryId`
+
+        Return -1 if column is not found, or if query has not yet been executed
+        """
+        if self.__dbFieldIdx is not None and isinstance(queryId, ManagedResourceTypes):
+            return self.__dbFieldIdx.get(columnName, -1)
+        return -1
 
-            # execute query
-            return (query.exec(), query)
+    def executeTagsQuery(self, queryId, bindValues={}):
+        """Execute tags query by Id
+
+        Query returns rows (resource Id, tag Id, tag name), sorted by tag name
+
+        Binding values and returned tuple are the same than executeQuery()
+        """
+        if self.__databaseInstance is not None and isinstance(queryId, ManagedResourceTypes):
+            return self.__executeQuery(self.__dbTagsQuery, queryId, bindValues)
 
         return (None, None)
 
@@ -518,13 +689,35 @@ class ManagedResourcesModel(QAbstractTableModel):
 
     ICON_MAX_SIZE = 384
 
+    # when more rows than given ratio are changed, model is reset rather than
+    # updated incrementally
+    __RESET_CHANGES_RATIO = 0.3
+
+    # checker board used as gradients thumbnails background (QImage)
+    __GRADIENT_CHECKERBOARD = None
+    # checker board tile brush (QImage texture) used as thumbnails background
+    __CHECKERBOARD_BRUSH = None
+
+    # maximum number of thumbnails kept in cache, in addition to thumbnails
+    # of current resources
+    __THUMBNAILS_CACHE_MAX_ITEMS = 256
+
     def __init__(self, parent=None):
         """Initialise list"""
         super(ManagedResourcesModel, self).__init__(parent)
         self.__items = []
+        # rows indexes, by resource Id and by (name, fileName)
+        self.__rowById = {}
+        self.__rowsByNameFile = {}
         self.__dbResources = DBManagedResources(os.path.join(Krita.instance().getAppDataLocation(), 'resourcecache.sqlite'))
         self.__resourceType = None
         self.__displayName = True
+        # thumbnails cache, least recently used first
+        # key=(resource type, md5sum), value=(thumbnail QPixmap, original image size)
+        self.__thumbnailsCache = OrderedDict()
+        # updateResources() is running / has been called again while running
+        self.__updating = False
+        self.__updatePending = False
 
     def columnCount(self, parent=QModelIndex()):
         """Return total number of column"""
@@ -543,22 +736,7 @@ class ManagedResourcesModel(QAbstractTableModel):
             if column == ManagedResourcesModel.COLNUM_ICON and self.__items[row].thumbnail() is not None:
                 return QIcon(self.__items[row].thumbnail())
         elif role == Qt.ToolTipRole:
-            txtTag = ''
-            txtImg = ''
-            if len(self.__items[row].tags()) > 0:
-                if len(self.__items[row].tags()) == 1:
-                    tag = i18n('Tag')
-                    tags = self.__items[row].tags()[0][1]
-                else:
-                    tag = i18n('Tags')
-                    tags = "</li><li>".join([tagProperty[1] for tagProperty in self.__items[row].tags()])
-                txtTag = f"<hr><b>{tag} ({len(self.__items[row].tags())})</b><ul><li>{tags}</li></ul>"
-
-            if self.__resourceType == ManagedResourceTypes.RES_PATTERNS:
-                size = self.__items[row].originalImgSize()
-                txtImg = f"<hr><b>{i18n('Pattern size')}</b> {size.width()}x{size.height()}"
-
-            return f"{self.__items[row].tooltip()}{txtImg}{txtTag}"
+            return self.__items[row].tooltipHtml()
         elif role == Qt.DisplayRole:
             if self.__displayName:
                 return self.__items[row].name()
@@ -574,67 +752,72 @@ class ManagedResourcesModel(QAbstractTableModel):
             return self.__items[row].name()
         return None
 
-    def updateResources(self, resourceType=None):
-        """Update resources from database"""
-        def resourceToQPixmap(resourceImg):
-            originalImgSize = None
-            pixmap = None
-            if not isinstance(resourceImg, QImage):
-                return pixmap
-
-            if self.__resourceType == ManagedResourceTypes.RES_GRADIENTS:
-                # Gradient resources returns a 2048x1 image size
-                # need to:
-                #   - return a 384x192 thumbnail
-                #   - generate a checked background in case gradient has transparent value
-                pixmap = QPixmap(ManagedResourcesModel.ICON_MAX_SIZE << 1, ManagedResourcesModel.ICON_MAX_SIZE)
-
-                imgData = QPixmap.fromImage(resourceImg)
-                originalImgSize = imgData.size()
-                checkerBoard = checkerBoardImage(pixmap.size())
-
-                painter = QPainter(pixmap)
-                painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
-                painter.drawPixmap(0, 0, checkerBoard)
-                painter.drawPixmap(QRect(0, 0, pixmap.width(), pixmap.height()), imgData)
-                painter.end()
+    @staticmethod
+    def __resourceToQImage(itemIndex, resourceImg, resourceType, checkerBoardBrush):
+        """Return a tuple (thumbnail, original image size) for given resource image
+
+        Method is executed from WorkerPool threads: thumbnail is built and returned as a QImage
+        (QPixmap can only be used from main thread), and checker board background is painted
+        with given `checkerBoardBrush` (a QImage texture brush)
+        """
+        if not isinstance(resourceImg, QImage):
+            return (None, QSize())
+
+        originalImgSize = resourceImg.size()
+
+        if resourceType == ManagedResourceTypes.RES_GRADIENTS:
+            # Gradient resources returns a 2048x1 image size
+            # need to:
+            #   - return a 384x192 thumbnail
+            #   - generate a checked background in case gradient has transparent value
+            #   - start from a copy of checker board (same for all gradients), and
+            #     draw gradient image directly over it
+            thumbnail = QImage(ManagedResourcesModel.__GRADIENT_CHECKERBOARD)
+
+            painter = QPainter(thumbnail)
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.drawImage(thumbnail.rect(), resourceImg)
+            painter.end()
+        else:
+            # for PATTERNS, PRESET, PALETTE
+            #   - Always return a square pixmap for which dimension is at least 384x384
+            #   - For PATTERNS & PALETTE, if size if less than expected, upscale using nearest neighbor method
+            #   - For PRESET, if size if less than expected, upscale using bilinear method
+            #   - For PATTERNS, set a checkerboard background
+            #   - If thumbnail is not a square, center it
+            if originalImgSize.width() == originalImgSize.height() and originalImgSize.width() >= ManagedResourcesModel.ICON_MAX_SIZE and \
+               (resourceType == ManagedResourceTypes.RES_PRESETS or not resourceImg.hasAlphaChannel()):
+                # already a square image that doesn't need to be upscaled, and
+                # without transparency to put over a checkerboard: nothing to paint
+                return (resourceImg, originalImgSize)
+
+            maxDim = max(originalImgSize.width(), originalImgSize.height(), ManagedResourcesModel.ICON_MAX_SIZE)
+
+            thumbnail = QImage(maxDim, maxDim, QImage.Format_ARGB32_Premultiplied)
+
+            # ensure thumbnail is transparent before starting to paint on it
+            thumbnail.fill(Qt.transparent)
+
+            if resourceType == ManagedResourceTypes.RES_PRESETS:
+                imgData = resourceImg.scaled(thumbnail.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
             else:
-                # for PATTERNS, PRESET, PALETTE
-                #   - Always return a square pixmap for which dimension is at least 384x384
-                #   - For PATTERNS & PALETTE, if size if less than expected, upscale using nearest neighbor method
-                #   - For PRESET, if size if less than expected, upscale using bilinear method
-                #   - For PATTERNS, set a checkerboard background
-                #   - If thumbnail is not a square, center it
-                imgData = QPixmap.fromImage(resourceImg)
-                originalImgSize = imgData.size()
-
-                minDim = min(originalImgSize.width(), originalImgSize.height())
-                maxDim = max(originalImgSize.width(), originalImgSize.height(), ManagedResourcesModel.ICON_MAX_SIZE)
-
-                pixmap = QPixmap(maxDim, maxDim)
-
-                # ensure pixmap is transparent before starting to paint on it
-                pixmap.fill(Qt.transparent)
-
-                if self.__resourceType == ManagedResourceTypes.RES_PRESETS:
-                    imgData = imgData.scaled(pixmap.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    checkerBoard = None
-                else:
-                    # need a checkerboard as background
-                    imgData = imgData.scaled(pixmap.size(), Qt.KeepAspectRatio, Qt.FastTransformation)
-                    checkerBoard = checkerBoardImage(imgData.size())
+                imgData = resourceImg.scaled(thumbnail.size(), Qt.KeepAspectRatio, Qt.FastTransformation)
 
-                pX = (pixmap.width() - imgData.width())//2
-                pY = (pixmap.height() - imgData.height())//2
+            pX = (thumbnail.width() - imgData.width())//2
+            pY = (thumbnail.height() - imgData.height())//2
 
-                painter = QPainter(pixmap)
-                if checkerBoard:
-                    painter.drawPixmap(pX, pY, checkerBoard)
-                painter.drawPixmap(pX, pY, imgData)
-                painter.end()
+            painter = QPainter(thumbnail)
+            if resourceType != ManagedResourceTypes.RES_PRESETS:
+                # need a checkerboard as background, aligned on image
+                painter.setBrushOrigin(pX, pY)
+                painter.fillRect(QRect(pX, pY, imgData.width(), imgData.height()), checkerBoardBrush)
+            painter.drawImage(pX, pY, imgData)
+            painter.end()
 
-            return (pixmap, originalImgSize)
+        return (thumbnail, originalImgSize)
 
+    def updateResources(self, resourceType=None):
+        """Update resources from database"""
         if isinstance(resourceType, ManagedResourceTypes):
             self.__resourceType = resourceType
         elif resourceType is not None:
@@ -643,42 +826,138 @@ class ManagedResourcesModel(QAbstractTableModel):
         if self.__resourceType is None:
             return
 
-        self.beginResetModel()
-        # query will return resources with their tags
-        query = self.__dbResources.executeQuery(self.__resourceType)
-        # get krita resource objects
-        kritaResources = Krita.instance().resources(self.__resourceType.value)
+        if self.__updating:
+            # called while waiting for thumbnails (WorkerPool process events):
+            # update is made once current update is finished
+            self.__updatePending = True
+            return
 
-        self.__items = []
+        self.__updating = True
+        try:
+            self.__updatePending = True
+            while self.__updatePending:
+                self.__updatePending = False
+                self.__updateResources()
+        finally:
+            self.__updating = False
+
+    def __updateResources(self):
+        """Update resources from database, for current resource type"""
+        resourceType = self.__resourceType
+
+        # get krita resource objects
+        kritaResources = Krita.instance().resources(resourceType.value)
+        # file names are retrieved once from krita resources
+        kritaFileNames = {name: kritaResource.filename() for name, kritaResource in kritaResources.items()}
+        # queries will return resources and their tags
+        # (names & file names from krita resources are used to reduce resources returned by database)
+        bindValues = {':resources': json.dumps(kritaFileNames)}
+        query = self.__dbResources.executeQuery(resourceType, bindValues)
+        tagsQuery = self.__dbResources.executeTagsQuery(resourceType, bindValues)
+
+        items = []
         if query[0]:
-            while query[1].next():
-                if query[1].value('name') in kritaResources and kritaResources[query[1].value('name')].filename() == query[1].value('fileName'):
-                    # by default, no tags
-                    tags = []
-                    if query[1].value('tagsId') != '':
-                        tagsId =  query[1].value('tagsId').split('\t')
-                        for index in range(len(tagsId)):
-                            tag = tuple(tagsId[index].split('\v'))
-                            tags.append((int(tag[0]), tag[1]))
-
-                        # sort tags by name
-                        tags.sort(key=lambda value: value[1])
-
-                    thumbnail, originalImgSize = resourceToQPixmap(kritaResources[query[1].value('name')].image())
-                    self.__items.append(ManagedResource({
-                            'id': query[1].value('id'),
-                            'name': query[1].value('name'),
-                            'fileName': query[1].value('fileName'),
-                            'tooltip': query[1].value('tooltip'),
-                            'thumbnail': thumbnail,
-                            'originalImgSize': originalImgSize,
-                            'tags': tags,
-                            'resource': kritaResources[query[1].value('name')],
-                            'type': self.__resourceType,
-                            'storageLocation': query[1].value('storageLocation'),
-                            'storageTypeId': query[1].value('storageTypeId'),
-                            'storageActive': (query[1].value('storageActive') == 1)
-                        }))
+            dbQuery = query[1]
+
+            # tags as list of tuples (tagId, tagName) sorted by name, by resource Id
+            tagsByResourceId = {}
+            if tagsQuery[0]:
+                dbTagsQuery = tagsQuery[1]
+                while dbTagsQuery.next():
+                    tagsByResourceId.setdefault(dbTagsQuery.value(0), []).append((dbTagsQuery.value(1), dbTagsQuery.value(2)))
+                dbTagsQuery.finish()
+
+            # columns indexes are resolved once by query, values are then read by index for each row
+            idxId = self.__dbResources.fieldIndex(resourceType, 'id')
+            idxName = self.__dbResources.fieldIndex(resourceType, 'name')
+            idxFileName = self.__dbResources.fieldIndex(resourceType, 'fileName')
+            idxTooltip = self.__dbResources.fieldIndex(resourceType, 'tooltip')
+            idxMd5sum = self.__dbResources.fieldIndex(resourceType, 'md5sum')
+            idxStorageLocation = self.__dbResources.fieldIndex(resourceType, 'storageLocation')
+            idxStorageTypeId = self.__dbResources.fieldIndex(resourceType, 'storageTypeId')
+            idxStorageActive = self.__dbResources.fieldIndex(resourceType, 'storageActive')
+
+            # read all rows first: query is released before thumbnails are built
+            rows = []
+            while dbQuery.next():
+                name = dbQuery.value(idxName)
+                fileName = dbQuery.value(idxFileName)
+                if kritaFileNames.get(name) != fileName:
+                    continue
+
+                kritaResource = kritaResources[name]
+
+                rows.append((dbQuery.value(idxId),
+                             name,
+                             fileName,
+                             dbQuery.value(idxTooltip),
+                             kritaResource,
+                             dbQuery.value(idxStorageLocation),
+                             dbQuery.value(idxStorageTypeId),
+                             dbQuery.value(idxStorageActive) == 1,
+                             dbQuery.value(idxMd5sum)))
+            dbQuery.finish()
+
+            # thumbnails for unchanged resources (same md5sum) are retrieved from cache
+            # (rows without thumbnail have no original image size)
+            thumbnails = [(None, QSize())] * len(rows)
+            cacheKeys = [None] * len(rows)
+            rowsToBuild = []
+            for index, row in enumerate(rows):
+                cacheKey = (resourceType, row[8])
+                cacheKeys[index] = cacheKey
+
+                if cacheKey in self.__thumbnailsCache:
+                    self.__thumbnailsCache.move_to_end(cacheKey)
+                    thumbnails[index] = self.__thumbnailsCache[cacheKey]
+                else:
+                    rowsToBuild.append(index)
+
+            if len(rowsToBuild) > 0:
+                # thumbnails are built in parallel from resources images
+                # - Krita resources images are retrieved from main thread
+                # - checker boards are prepared from main thread (QPixmap are needed to build them)
+                if resourceType == ManagedResourceTypes.RES_GRADIENTS and ManagedResourcesModel.__GRADIENT_CHECKERBOARD is None:
+                    ManagedResourcesModel.__GRADIENT_CHECKERBOARD = checkerBoardImage(QSize(ManagedResourcesModel.ICON_MAX_SIZE << 1, ManagedResourcesModel.ICON_MAX_SIZE)).toImage()
+                if ManagedResourcesModel.__CHECKERBOARD_BRUSH is None:
+                    # texture as QImage, to be usable from threads
+                    ManagedResourcesModel.__CHECKERBOARD_BRUSH = QBrush(checkerBoardBrush().texture().toImage())
+
+                builtThumbnails = WorkerPool().map([rows[index][4].image() for index in rowsToBuild],
+                                                   ManagedResourcesModel.__resourceToQImage,
+                                                   resourceType,
+                                                   ManagedResourcesModel.__CHECKERBOARD_BRUSH)
+
+                for index, builtThumbnail in zip(rowsToBuild, builtThumbnails):
+                    if builtThumbnail is None:
+                        # worker failed to build thumbnail
+                        continue
+
+                    thumbnail, originalImgSize = builtThumbnail
+                    if thumbnail is None:
+                        thumbnails[index] = (None, originalImgSize)
+                    else:
+                        thumbnails[index] = (QPixmap.fromImage(thumbnail), originalImgSize)
+                        self.__thumbnailsCache[cacheKeys[index]] = thumbnails[index]
+
+            # thumbnails of current resources are the most recently used: oldest
+            # thumbnails are removed first
+            while len(self.__thumbnailsCache) > len(rows) + ManagedResourcesModel.__THUMBNAILS_CACHE_MAX_ITEMS:
+                self.__thumbnailsCache.popitem(last=False)
+
+            for (resourceId, name, fileName, tooltip, kritaResource, storageLocation, storageTypeId, storageActive, md5sum), (thumbnail, originalImgSize) in zip(rows, thumbnails):
+                items.append(ManagedResource.fromRow(resourceId,
+                                                     name,
+                                                     fileName,
+                                                     name if tooltip is None else tooltip,
+                                                     thumbnail,
+                                                     originalImgSize,
+                                                     tagsByResourceId.get(resourceId, []),
+                                                     kritaResource,
+                                                     resourceType,
+                                                     storageLocation,
+                                                     storageTypeId,
+                                                     storageActive))
         elif query[1]:
             err = query[1].lastError()
             print(err.databaseText())
@@ -687,7 +966,92 @@ class ManagedResourcesModel(QAbstractTableModel):
         else:
             print("Not connected to DB?")
 
-        self.endResetModel()
+        self.__setItems(items)
+
+    @staticmethod
+    def __itemState(item):
+        """Return a tuple of item properties used to check if a row has changed"""
+        thumbnail = item.thumbnail()
+        return (item.name(),
+                item.fileName(),
+                item.tooltip(),
+                item.tags(),
+                item.originalImgSize(),
+                None if thumbnail is None else thumbnail.cacheKey(),
+                item.storageLocation(),
+                item.storageTypeId(),
+                item.storageActive())
+
+    def __setItems(self, items):
+        """Replace current items with given `items`
+
+        Rows are removed, inserted and updated incrementally, unless changes
+        are too important; in this case model is reset
+        """
+        oldRowById = {item.id(): row for row, item in enumerate(self.__items)}
+        newRowById = {item.id(): row for row, item in enumerate(items)}
+
+        removedRows = [row for row, item in enumerate(self.__items) if item.id() not in newRowById]
+        insertedRows = [row for row, item in enumerate(items) if item.id() not in oldRowById]
+        updatedRows = [row for row, item in enumerate(items)
+                       if item.id() in oldRowById and
+                       ManagedResourcesModel.__itemState(item) != ManagedResourcesModel.__itemState(self.__items[oldRowById[item.id()]])]
+
+        nbChanges = len(removedRows) + len(insertedRows) + len(updatedRows)
+        if (len(self.__items) == 0 or
+           len(items) == 0 or
+           self.__items[0].type() != items[0].type() or
+           nbChanges > ManagedResourcesModel.__RESET_CHANGES_RATIO * max(len(self.__items), len(items)) or
+           # kept rows must be in the same order
+           [item.id() for item in self.__items if item.id() in newRowById] != [item.id() for item in items if item.id() in oldRowById]):
+            self.beginResetModel()
+            self.__items = items
+            self.__updateIndexes()
+            self.endResetModel()
+            return
+
+        if nbChanges == 0:
+            # keep current items, only Krita resources objects can differ
+            self.__items = items
+            return
+
+        # remove rows, by contiguous blocks, starting from last one
+        while removedRows:
+            last = removedRows.pop()
+            first = last
+            while removedRows and removedRows[-1] == first - 1:
+                first = removedRows.pop()
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.__items[first:last + 1]
+            self.endRemoveRows()
+
+        # insert rows, by contiguous blocks, starting from first one
+        # (as kept rows are in the same order, rows are inserted at their final position)
+        index = 0
+        while index < len(insertedRows):
+            first = insertedRows[index]
+            last = first
+            index += 1
+            while index < len(insertedRows) and insertedRows[index] == last + 1:
+                last = insertedRows[index]
+                index += 1
+            self.beginInsertRows(QModelIndex(), first, last)
+            self.__items[first:first] = items[first:last + 1]
+            self.endInsertRows()
+
+        self.__items = items
+        self.__updateIndexes()
+
+        for row in updatedRows:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, ManagedResourcesModel.COLNUM_LAST))
+
+    def __updateIndexes(self):
+        """Build rows indexes used by getResource()"""
+        self.__rowById = {}
+        self.__rowsByNameFile = {}
+        for row, item in enumerate(self.__items):
+            self.__rowById.setdefault(item.id(), row)
+            self.__rowsByNameFile.setdefault((item.name(), item.fileName()), []).append(row)
 
     def displayName(self):
         """Return if name is returned for display"""
@@ -725,18 +1089,36 @@ class ManagedResourcesModel(QAbstractTableModel):
         if not isinstance(resource, (ManagedResource, int, tuple, Resource)):
             raise EInvalidType("Given `resources` is not valid")
 
-        for row in range(self.rowCount()):
-            index = self.index(row, 0)
-            data = self.data(index, ManagedResourcesModel.ROLE_MANAGEDRESOURCE)
-
-            if isinstance(resource, int) and resource == data.id() or\
-               isinstance(resource, ManagedResource) and resource == data or\
-               isinstance(resource, Resource) and resource == data.resource() or\
-               isinstance(resource, tuple) and resource[0] == data.name() and resource[1] == data.fileName():
-                if asIndex:
-                    return index
-                return data
-        return None
+        # search row from indexes
+        foundRow = None
+        if isinstance(resource, int):
+            foundRow = self.__rowById.get(resource)
+        elif isinstance(resource, ManagedResource):
+            row = self.__rowById.get(resource.id())
+            if row is not None and resource == self.__items[row]:
+                foundRow = row
+        elif isinstance(resource, tuple):
+            rows = self.__rowsByNameFile.get(resource[:2])
+            if rows:
+                foundRow = rows[0]
+        else:
+            # Krita Resource: check rows with same name/file name first
+            for row in self.__rowsByNameFile.get((resource.name(), resource.filename()), []):
+                if resource == self.__items[row].resource():
+                    foundRow = row
+                    break
+            else:
+                # Resource equality is not based on name/file name; ensure it's not another row
+                for row, item in enumerate(self.__items):
+                    if resource == item.resource():
+                        foundRow = row
+                        break
+
+        if foundRow is None:
+            return None
+        elif asIndex:
+            return self.index(foundRow, 0)
+        return self.__items[foundRow]
 
     def includeStorageInactive(self):
         """Return if resources from inactive storage are returned"""
@@ -919,6 +919,8 @@ class Tokenizer(object):
     __TOKEN_WRONGINDENT_RULE = TokenizerRule(TokenType.WRONG_INDENT, '')
     __TOKEN_WRONGDEDENT_RULE = TokenizerRule(TokenType.WRONG_DEDENT, '')
 
+    __RULES_BY_TOKEN_TEXT_MAX = 10000
+
     def __init__(self, rules=None):
         # internal storage for rules (list of TokenizerRule)
         self.__rules = []
@@ -928,6 +930,10 @@ class Tokenizer(object):
         # a global regEx with all rules
         self.__regEx = None
 
+        # rules matching a token text, in rules order
+        # key=token text, value=list of rules
+        self.__rulesByTokenText = {}
+
         # list of rules with multiline management
         # None if not initialised, otherwise a list
         self.__multilineRules = None
@@ -1143,10 +1149,27 @@ class Tokenizer(object):
         if self.__needUpdate:
             self.clearCache(True)
             self.__needUpdate = False
+            self.__rulesByTokenText = {}
             self.__regEx = QRegularExpression('|'.join([ruleInsensitive(rule) for rule in self.__rules]), QRegularExpression.MultilineOption | QRegularExpression.UseUnicodePropertiesOption)
 
         return self.__regEx
 
+    def __tokenTextRules(self, tokenText):
+        """Return list of rules for which regular expression match given `tokenText`
+
+        Result only depends of token text and rules, so it's cached: look behind/ahead
+        checks, which depend on token context, are still made by tokenize()
+        """
+        if tokenText in self.__rulesByTokenText:
+            return self.__rulesByTokenText[tokenText]
+
+        if len(self.__rulesByTokenText) > Tokenizer.__RULES_BY_TOKEN_TEXT_MAX:
+            self.__rulesByTokenText = {}
+
+        returned = [rule for rule in self.__rules if rule.regEx(True).match(tokenText).hasMatch()]
+        self.__rulesByTokenText[tokenText] = returned
+        return returned
+
     def clearCache(self, full=True):
         """Clear cache content
 
@@ -1264,110 +1287,109 @@ class Tokenizer(object):
                     continue
 
                 position = 0
-                for rule in self.__rules:
+                for rule in self.__tokenTextRules(tokenText):
                     # We've got a token, we need to determinate token type
-                    # ==> loop on rules, check one by one if token match rule
+                    # ==> loop on rules matching token, check one by one if token context match rule
                     #     if yes, then token type is known
 
-                    if rule.regEx(True).match(tokenText).hasMatch():
-                        if regex := rule.regExLookBehind():
-                            # need to check if not preceded by
-                            matchedP = regex.match(text[0:match.capturedStart(textIndex)])
-                            if matchedP.hasMatch():
-                                if regex.isNegative:
-                                    # there's a match and we have a negative look behind, search next rule
-                                    continue
-                            else:
-                                if not regex.isNegative:
-                                    # there's no match and we have a positive behind, search next rule
-                                    continue
-
-                        if regex := rule.regExLookAhead():
-                            # need to check if not followed by
-                            matchedF = regex.match(text[match.capturedStart(textIndex) + match.capturedLength(textIndex):])
-                            if matchedF.hasMatch():
-                                if regex.isNegative:
-                                    # there's a match and we have a negative look behind, search next rule
-                                    continue
-                            else:
-                                if not regex.isNegative:
-                                    # there's no match and we have a positive behind, search next rule
-                                    continue
-
-                        token = Token(tokenText, rule,
-                                      match.capturedStart(textIndex),
-                                      match.capturedEnd(textIndex),
-                                      match.capturedLength(textIndex),
-                                      self.__simplifyTokenSpaces)
-
-                        # ---- manage indent/dedent ----
-                        if not rule.ignoreIndent() and indent != 0 and (re.search(r'^\s*$', tokenText) is None) and token.column() == 1:
-                            # indent value is not zero => means that indent are managed
-                            # token is not empty string (only spaces and/or newline)
-                            if indent < 0 and token.indent() > 0:
-                                # if indent is negative, define indent value with first indented token
-                                indent = token.indent()
-
-                            if indent > 0:
-                                if previousIndent < token.indent():
-                                    # token indent is greater than previous indent value
-                                    # need to add INDENT token
-                                    nbIndent, nbWrongIndent = divmod(token.indent() - previousIndent, indent)
-
-                                    for numIndent in range(nbIndent):
-                                        pStart = token.positionStart() + indent * numIndent
-                                        pEnd = token.positionStart() + indent * (numIndent + 1)
-                                        length = pEnd-pStart
-
-                                        tokenIndent = Token(' ' * indent, Tokenizer.__TOKEN_INDENT_RULE, pStart, pEnd, length)
-                                        tokenIndent.setPrevious(previousToken)
-                                        returned.append(tokenIndent)
-                                        previousToken = tokenIndent
-
-                                    if nbWrongIndent > 0:
-                                        pStart = token.positionStart() + indent * (numIndent + 1)
-                                        pEnd = pStart+nbWrongIndent
-
-                                        tokenIndent = Token(' ' * nbWrongIndent, Tokenizer.__TOKEN_WRONGINDENT_RULE, pStart, pEnd, nbWrongIndent)
-                                        tokenIndent.setPrevious(previousToken)
-                                        returned.append(tokenIndent)
-                                        previousToken = tokenIndent
-
-                                elif previousIndent > token.indent():
-                                    # token indent is lower than previous indent value
-                                    # need to add DEDENT token
-                                    nbIndent, nbWrongIndent = divmod(previousIndent - token.indent(), indent)
-
-                                    for numIndent in range(nbIndent):
-                                        pStart = token.positionStart() + indent * numIndent
-                                        pEnd = token.positionStart() + indent * (numIndent + 1)
-                                        length = pEnd-pStart
-
-                                        tokenIndent = Token(' ' * indent, Tokenizer.__TOKEN_DEDENT_RULE, pStart, pEnd, length)
-                                        tokenIndent.setPrevious(previousToken)
-                                        returned.append(tokenIndent)
-                                        previousToken = tokenIndent
-
-                                    if nbWrongIndent > 0:
-                                        pStart = token.positionStart() + indent * (numIndent + 1)
-                                        pEnd = pStart+nbWrongIndent
-
-                                        tokenIndent = Token(' ' * nbWrongIndent, Tokenizer.__TOKEN_WRONGDEDENT_RULE, pStart, pEnd, nbWrongIndent)
-                                        tokenIndent.setPrevious(previousToken)
-                                        returned.append(tokenIndent)
-                                        previousToken = tokenIndent
-
-                                previousIndent = token.indent()
-
-                        token.setPrevious(previousToken)
-                        if previousToken is not None:
-                            previousToken.setNext(token)
-                        returned.append(token)
-                        previousToken = token
-
-                        # token type is found:
-                        # => do not need to continue to check for an another token type
-                        break
+                    if regex := rule.regExLookBehind():
+                        # need to check if not preceded by
+                        matchedP = regex.match(text[0:match.capturedStart(textIndex)])
+                        if matchedP.hasMatch():
+                            if regex.isNegative:
+                                # there's a match and we have a negative look behind, search next rule
+                                continue
+                        else:
+                            if not regex.isNegative:
+                                # there's no match and we have a positive behind, search next rule
+                                continue
+
+                    if regex := rule.regExLookAhead():
+                        # need to check if not followed by
+                        matchedF = regex.match(text[match.capturedStart(textIndex) + match.capturedLength(textIndex):])
+                        if matchedF.hasMatch():
+                            if regex.isNegative:
+                                # there's a match and we have a negative look behind, search next rule
+                                continue
+                        else:
+                            if not regex.isNegative:
+                                # there's no match and we have a positive behind, search next rule
+                                continue
+
+                    token = Token(tokenText, rule,
+                                  match.capturedStart(textIndex),
+                                  match.capturedEnd(textIndex),
+                                  match.capturedLength(textIndex),
+                                  self.__simplifyTokenSpaces)
+
+                    # ---- manage indent/dedent ----
+                    if not rule.ignoreIndent() and indent != 0 and (re.search(r'^\s*$', tokenText) is None) and token.column() == 1:
+                        # indent value is not zero => means that indent are managed
+                        # token is not empty string (only spaces and/or newline)
+                        if indent < 0 and token.indent() > 0:
+                            # if indent is negative, define indent value with first indented token
+                            indent = token.indent()
+
+                        if indent > 0:
+                            if previousIndent < token.indent():
+                                # token indent is greater than previous indent value
+                                # need to add INDENT token
+                                nbIndent, nbWrongIndent = divmod(token.indent() - previousIndent, indent)
+
+                                for numIndent in range(nbIndent):
+                                    pStart = token.positionStart() + indent * numIndent
+                                    pEnd = token.positionStart() + indent * (numIndent + 1)
+                                    length = pEnd-pStart
+
+                                    tokenIndent = Token(' ' * indent, Tokenizer.__TOKEN_INDENT_RULE, pStart, pEnd, length)
+                                    tokenIndent.setPrevious(previousToken)
+                                    returned.append(tokenIndent)
+                                    previousToken = tokenIndent
+
+                                if nbWrongIndent > 0:
+                                    pStart = token.positionStart() + indent * (numIndent + 1)
+                                    pEnd = pStart+nbWrongIndent
+
+                                    tokenIndent = Token(' ' * nbWrongIndent, Tokenizer.__TOKEN_WRONGINDENT_RULE, pStart, pEnd, nbWrongIndent)
+                                    tokenIndent.setPrevious(previousToken)
+                                    returned.append(tokenIndent)
+                                    previousToken = tokenIndent
+
+                            elif previousIndent > token.indent():
+                                # token indent is lower than previous indent value
+                                # need to add DEDENT token
+                                nbIndent, nbWrongIndent = divmod(previousIndent - token.indent(), indent)
+
+                                for numIndent in range(nbIndent):
+                                    pStart = token.positionStart() + indent * numIndent
+                                    pEnd = token.positionStart() + indent * (numIndent + 1)
+                                    length = pEnd-pStart
+
+                                    tokenIndent = Token(' ' * indent, Tokenizer.__TOKEN_DEDENT_RULE, pStart, pEnd, length)
+                                    tokenIndent.setPrevious(previousToken)
+                                    returned.append(tokenIndent)
+                                    previousToken = tokenIndent
+
+                                if nbWrongIndent > 0:
+                                    pStart = token.positionStart() + indent * (numIndent + 1)
+                                    pEnd = pStart+nbWrongIndent
+
+                                    tokenIndent = Token(' ' * nbWrongIndent, Tokenizer.__TOKEN_WRONGDEDENT_RULE, pStart, pEnd, nbWrongIndent)
+                                    tokenIndent.setPrevious(previousToken)
+                                    returned.append(tokenIndent)
+                                    previousToken = tokenIndent
+
+                            previousIndent = token.indent()
+
+                    token.setPrevious(previousToken)
+                    if previousToken is not None:
+                        previousToken.setNext(token)
+                    returned.append(token)
+                    previousToken = token
+
+                    # token type is found:
+                    # => do not need to continue to check for an another token type
+                    break
 
         # add
         self.__setCache(hashValue, Tokens(text, returned))
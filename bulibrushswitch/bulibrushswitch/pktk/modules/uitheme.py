@@ -29,10 +29,14 @@
 # -----------------------------------------------------------------------------
 
 import os
-import re
+import sys
+
+from functools import lru_cache
+from types import MappingProxyType
 
 from PyQt5.QtCore import (
-        QResource
+        QResource,
+        QTimer
     )
 from PyQt5.QtGui import (
         QPalette,
@@ -44,11 +48,37 @@ from PyQt5.QtWidgets import (
     )
 
 
+from .imgutils import (
+        resetBuildIconCache,
+        resetIconListCache
+    )
 from ..pktk import *
 
 
 # -----------------------------------------------------------------------------
 
+@lru_cache(maxsize=1024)
+def _qcolorFromStr(value):
+    """Return QColor for given color string
+
+    Parsed colors are cached: returned instance must never be exposed or
+    modified, use _qcolor() to get a copy
+    """
+    return QColor(value)
+
+
+def _qcolor(value):
+    """Return a new QColor for given `value` (a <str> or a <QColor>)"""
+    if isinstance(value, QColor):
+        return QColor(value)
+    return QColor(_qcolorFromStr(value))
+
+
+def _frozenStyles(styles):
+    """Return a read only styles dictionary, with interned styles names"""
+    return MappingProxyType({sys.intern(name): style for name, style in styles.items()})
+
+
 class UITheme(object):
     """Manage theme
 
@@ -73,8 +103,22 @@ class UITheme(object):
             }
     }
 
+    # styles sheet by theme, with fallback on dark theme styles
+    __RESOLVED_STYLES = {
+        DARK_THEME: _frozenStyles(STYLES_SHEET[DARK_THEME]),
+        LIGHT_THEME: _frozenStyles({**STYLES_SHEET[DARK_THEME], **STYLES_SHEET[LIGHT_THEME]})
+    }
+
     __themes = {}
+    # first loaded theme, used by style() and theme()
+    __firstTheme = None
     __kraActiveWindow = None
+    __windowCreatedConnected = False
+
+    # reload of resources is delayed, to process consecutive reload requests only once
+    __RELOAD_DELAY = 50
+    __reloadTimer = None
+    __reloadClearPixmapCache = False
 
     @staticmethod
     def load(rccPath=None, autoReload=True):
@@ -86,7 +130,7 @@ class UITheme(object):
             if UITheme.__kraActiveWindow is None:
                 UITheme.__kraActiveWindow = Krita.instance().activeWindow()
                 if UITheme.__kraActiveWindow is not None:
-                    UITheme.__kraActiveWindow.themeChanged.connect(UITheme.reloadResources)
+                    UITheme.__kraActiveWindow.themeChanged.connect(UITheme.__themeChanged)
 
         if rccPath is None:
             # by default if no path is provided, load default PkTk theme
@@ -94,19 +138,58 @@ class UITheme(object):
 
         if rccPath not in UITheme.__themes:
             UITheme.__themes[rccPath] = UITheme(rccPath, autoReload)
+            if UITheme.__firstTheme is None:
+                UITheme.__firstTheme = UITheme.__themes[rccPath]
 
         # Initialise connector on theme changed
         initThemeChanged()
 
         # If not initialised (main window not yet created), initialise it when main window is created
-        if UITheme.__kraActiveWindow is None:
+        # (connect only once, whatever the number of loaded themes)
+        if UITheme.__kraActiveWindow is None and not UITheme.__windowCreatedConnected:
+            UITheme.__windowCreatedConnected = True
             Krita.instance().notifier().windowCreated.connect(initThemeChanged)
 
     @staticmethod
-    def reloadResources(clearPixmapCache=None):
-        """Reload resources"""
+    def reloadResources(clearPixmapCache=None, delayed=False):
+        """Reload resources
+
+        If `delayed` is True, reload is made later: consecutive delayed calls
+        are processed only once
+        Otherwise resources are reloaded immediately (pending delayed reload included)
+        """
         if clearPixmapCache is None:
             clearPixmapCache = True
+        UITheme.__reloadClearPixmapCache = UITheme.__reloadClearPixmapCache or clearPixmapCache
+
+        if not delayed:
+            if UITheme.__reloadTimer is not None:
+                UITheme.__reloadTimer.stop()
+            UITheme.__reloadResources()
+            return
+
+        if UITheme.__reloadTimer is None:
+            UITheme.__reloadTimer = QTimer()
+            UITheme.__reloadTimer.setSingleShot(True)
+            UITheme.__reloadTimer.setInterval(UITheme.__RELOAD_DELAY)
+            UITheme.__reloadTimer.timeout.connect(UITheme.__reloadResources)
+
+        if not UITheme.__reloadTimer.isActive():
+            UITheme.__reloadTimer.start()
+
+    @staticmethod
+    def __themeChanged():
+        """Krita theme has been changed
+
+        Signal can be emitted many times in a row: reload is delayed
+        """
+        UITheme.reloadResources(True, True)
+
+    @staticmethod
+    def __reloadResources():
+        """Reload resources for all themes"""
+        clearPixmapCache = UITheme.__reloadClearPixmapCache
+        UITheme.__reloadClearPixmapCache = False
         for theme in UITheme.__themes:
             if UITheme.__themes[theme].getAutoReload():
                 # reload
@@ -117,16 +200,16 @@ class UITheme(object):
     @staticmethod
     def style(name):
         """Return style according to current theme"""
-        for theme in UITheme.__themes:
-            # return style from first theme (should be the same for all themes)
-            return UITheme.__themes[theme].getStyle(name)
+        # return style from first theme (should be the same for all themes)
+        if UITheme.__firstTheme is not None:
+            return UITheme.__firstTheme.getStyle(name)
 
     @staticmethod
     def theme():
         """Return style according to current theme"""
-        for theme in UITheme.__themes:
-            # return style from first theme (should be the same for all themes)
-            return UITheme.__themes[theme].getTheme()
+        # return theme from first theme (should be the same for all themes)
+        if UITheme.__firstTheme is not None:
+            return UITheme.__firstTheme.getTheme()
 
     def __init__(self, rccPath, autoReload=True):
         """The given `rccPath` is full path to directory where .rcc files can be found
@@ -146,43 +229,68 @@ class UITheme(object):
         self.__autoReload = autoReload
         self.__kraActiveWindow = None
 
+        # resource file to register, by theme
+        if self.__rccPath.endswith('.rcc'):
+            self.__rccFiles = {UITheme.DARK_THEME: self.__rccPath,
+                               UITheme.LIGHT_THEME: self.__rccPath}
+        else:
+            self.__rccFiles = {UITheme.DARK_THEME: os.path.join(self.__rccPath, f'{UITheme.DARK_THEME}theme_icons.rcc'),
+                               UITheme.LIGHT_THEME: os.path.join(self.__rccPath, f'{UITheme.LIGHT_THEME}theme_icons.rcc')}
+
+        # resource files content, by file name (read on first use)
+        self.__rccData = {}
+
         self.loadResources(False)
 
     def loadResources(self, clearPixmapCache=True):
         """Load resources for current theme"""
+        palette = QApplication.palette()
+
+        if palette.color(QPalette.Window).value() <= 128:
+            theme = UITheme.DARK_THEME
+        else:
+            theme = UITheme.LIGHT_THEME
+
+        if theme == self.__theme and self.__registeredResource is not None:
+            # theme is not changed, resources are already loaded
+            return
+
         # Need to clear pixmap cache otherwise some icons are not reloaded from new resource file
         if clearPixmapCache:
             QPixmapCache.clear()
+            resetBuildIconCache()
+            resetIconListCache()
 
         if self.__registeredResource is not None:
-            QResource.unregisterResource(self.__registeredResource)
-
-        palette = QApplication.palette()
+            QResource.unregisterResourceData(self.__registeredResource)
 
-        if palette.color(QPalette.Window).value() <= 128:
-            self.__theme = UITheme.DARK_THEME
-        else:
-            self.__theme = UITheme.LIGHT_THEME
+        self.__theme = theme
 
-        if re.search(r"\.rcc$", self.__rccPath):
-            self.__registeredResource = self.__rccPath
-        else:
-            self.__registeredResource = os.path.join(self.__rccPath, f'{self.__theme}theme_icons.rcc')
+        # resource is registered from file content read once, to avoid reading
+        # file again each time theme is changed
+        # (registered data must be kept in memory while resource is registered)
+        self.__registeredResource = self.__getRccData(self.__rccFiles[self.__theme])
 
-        if not QResource.registerResource(self.__registeredResource):
+        if self.__registeredResource is None or not QResource.registerResourceData(self.__registeredResource):
             self.__registeredResource = None
 
+    def __getRccData(self, fileName):
+        """Return content of resource file `fileName`, or None if file can't be read"""
+        if fileName not in self.__rccData:
+            try:
+                with open(fileName, 'rb') as file:
+                    self.__rccData[fileName] = file.read()
+            except Exception:
+                self.__rccData[fileName] = None
+        return self.__rccData[fileName]
+
     def getTheme(self):
         """Return current theme"""
         return self.__theme
 
     def getStyle(self, name):
         """Return style according to current theme"""
-        if name in UITheme.STYLES_SHEET[self.__theme]:
-            return UITheme.STYLES_SHEET[self.__theme][name]
-        elif self.__theme != UITheme.DARK_THEME and name in UITheme.STYLES_SHEET[UITheme.DARK_THEME]:
-            return UITheme.STYLES_SHEET[UITheme.DARK_THEME][name]
-        return ''
+        return UITheme.__RESOLVED_STYLES[self.__theme].get(name, '')
 
     def getAutoReload(self):
         """Return if autoreload is activated for theme"""
@@ -195,6 +303,12 @@ class BaseTheme(object):
     Theme define global theme (foreground, background, gutter text, ...)
     TokenStyle, set through LanguageDef define colors to apply for a specific thme/language
     """
+    __slots__ = ('__id',
+                 '__name',
+                 '__baseTheme',
+                 '__colors',
+                 '__comments')
+
     def __init__(self, id, name, colors=None, baseTheme=None, comments=[]):
         if not isinstance(id, str) or id == '':
             raise EInvalidType('Given `id` must be non empty <str>')
@@ -208,9 +322,8 @@ class BaseTheme(object):
         self.__name = name
         self.__baseTheme = baseTheme
         self.__colors = {}
-        self.__comments = comments
-        while len(self.__comments) < 2:
-            self.__comments.append('')
+        # at least 2 comments lines
+        self.__comments = comments + [''] * (2 - len(comments))
 
         if isinstance(colors, dict):
             for key, value in colors.items():
@@ -218,7 +331,8 @@ class BaseTheme(object):
                     raise EInvalidValue("Given colors must have a <str> key and a color <str> value")
 
                 try:
-                    self.__colors[key] = QColor(value)
+                    # color ids are shared by all themes
+                    self.__colors[sys.intern(key)] = _qcolor(value)
                 except Exception as e:
                     raise EInvalidValue("Given colors must have a <str> key and a color <str> value")
         elif isinstance(colors, BaseTheme):
@@ -246,10 +360,11 @@ class BaseTheme(object):
         return self.__comments
 
     def color(self, colorId):
-        if colorId in self.__colors:
-            return self.__colors[colorId]
-
-        raise EInvalidValue("Given `colorId` is not a value identifier")
+        # colors are never None
+        returned = self.__colors.get(colorId)
+        if returned is None:
+            raise EInvalidValue("Given `colorId` is not a value identifier")
+        return returned
 
     def toDict(self):
         """Export theme as dictionnary
@@ -270,31 +385,39 @@ class BaseTheme(object):
                 'colors': {id: color.name(QColor.HexArgb) for id, color in self.__colors.items()}
             }
 
-    def fromDict(self, source):
-        """Import theme from a dictionnary"""
-        if not isinstance(source, dict):
-            raise EInvalidType("Given `source` must be a <dict>")
-        elif 'id' not in source or not isinstance(source['id'], str) or source['id'] == '':
-            raise EInvalidValue("Given `source` must contain 'id' key, with a non empty <string> value")
-        elif 'name' not in source or not isinstance(source['name'], str) or source['name'] == '':
-            raise EInvalidValue("Given `source` must contain 'name' key, with a non empty <str> value")
-        elif 'comments' not in source or not isinstance(source['comments'], list):
-            raise EInvalidValue("Given `source` must contain 'comments' key as <list> of <str>")
-        elif 'colors' not in source:
-            raise EInvalidValue("Given `source` must contain 'colors' key")
+    def fromDict(self, source, validate=True):
+        """Import theme from a dictionnary
+
+        If `validate` is False, given `source` is considered as valid (trusted source
+        like a dictionary returned by toDict()) and content is not checked
+        """
+        if validate:
+            if not isinstance(source, dict):
+                raise EInvalidType("Given `source` must be a <dict>")
+            elif 'id' not in source or not isinstance(source['id'], str) or source['id'] == '':
+                raise EInvalidValue("Given `source` must contain 'id' key, with a non empty <string> value")
+            elif 'name' not in source or not isinstance(source['name'], str) or source['name'] == '':
+                raise EInvalidValue("Given `source` must contain 'name' key, with a non empty <str> value")
+            elif 'comments' not in source or not isinstance(source['comments'], list):
+                raise EInvalidValue("Given `source` must contain 'comments' key as <list> of <str>")
+            elif 'colors' not in source:
+                raise EInvalidValue("Given `source` must contain 'colors' key")
 
         self.__id = source['id']
         self.__name = source['name']
-        self.__comments = source['comments']
-        while len(self.__comments) < 2:
-            self.__comments.append('')
+        # at least 2 comments lines
+        self.__comments = source['comments'] + [''] * (2 - len(source['comments']))
+
+        if not validate:
+            self.__colors = {sys.intern(key): _qcolor(value) for key, value in source['colors'].items()}
+            return
 
         self.__colors = {}
         for key, value in source['colors'].items():
             if not isinstance(key, str) or not isinstance(value, (QColor, str)):
                 raise EInvalidValue("Given colors must have a <str> key and a color <str> value")
             try:
-                self.__colors[key] = QColor(value)
+                self.__colors[sys.intern(key)] = _qcolor(value)
             except Exception as e:
                 raise EInvalidValue("Given colors must have a <str> key and a color <str> value")
 
@@ -302,4 +425,9 @@ class BaseTheme(object):
         """Import theme from a BaseTheme"""
         if not isinstance(source, BaseTheme):
             raise EInvalidType("Given `source` must be a <BaseTheme>")
-        self.fromDict(source.toDict())
+
+        # copy properties directly, colors don't need to be exported/parsed
+        self.__id = source.__id
+        self.__name = source.__name
+        self.__comments = list(source.__comments)
+        self.__colors = {key: QColor(color) for key, color in source.__colors.items()}
@@ -30,7 +30,6 @@
 # From Qt documentation example "Code Editor"
 #  https://doc.qt.io/qtforpython-5.12/overviews/qtwidgets-widgets-codeeditor-example.html
 
-from math import ceil
 import re
 import time
 
@@ -98,6 +97,9 @@ class WCodeEditorTheme(BaseTheme):
     RIGHT_LIMIT = 'rightLimit'
     SPACES = 'spaces'
 
+    # no additional attribute: keep BaseTheme instances without __dict__
+    __slots__ = ()
+
     def __init__(self, id, name, colors, base, comments):
         super(WCodeEditorTheme, self).__init__(id, name, colors, base, comments)
 
@@ -140,6 +142,7 @@ class WCodeEditorBlockUserData(QTextBlockUserData):
         self.__extraSelections = []
         self.__tokens = None
         self.__text = ''
+        self.__rulesRevision = -1
 
     def __del__(self):
         self.__extraSelections = []
@@ -172,6 +175,14 @@ class WCodeEditorBlockUserData(QTextBlockUserData):
         """Set block text"""
         self.__text = text
 
+    def rulesRevision(self):
+        """Return revision of highlighted lines rules applied to block"""
+        return self.__rulesRevision
+
+    def setRulesRevision(self, revision):
+        """Set revision of highlighted lines rules applied to block"""
+        self.__rulesRevision = revision
+
 
 class WCodeEditor(QPlainTextEdit):
     """Extended editor with syntax highlighting, autocompletion, line number..."""
@@ -311,6 +322,14 @@ class WCodeEditor(QPlainTextEdit):
 
         # rules to highlight some lines
         self.__highlightedLinesRules = []
+        # incremented each time rules have to be applied again on all blocks
+        self.__highlightedLinesRulesRevision = 0
+
+        # current line extra selection, and its last known position in extra selections list
+        self.__currentLineSelection = QTextEdit.ExtraSelection()
+        self.__currentLineSelection.format.setProperty(QTextFormat.FullWidthSelection, True)
+        self.__currentLineSelection.format.setProperty(WCodeEditor.__EXTRASELECTIONPROP_TYPE, WCodeEditor.__EXTRASELECTIONTYPE_CURRENTLINE)
+        self.__currentLineSelectionIndex = 0
 
         self.__shortCuts = {
             QKeySequence(Qt.Key_Tab): WCodeEditor.KEY_INDENT,
@@ -333,6 +352,9 @@ class WCodeEditor(QPlainTextEdit):
             QKeySequence(Qt.Key_Return + Qt.SHIFT): WCodeEditor.KEY_IGNORE,
             QKeySequence(Qt.Key_Enter + Qt.SHIFT): WCodeEditor.KEY_IGNORE
         }
+        # shortcuts actions, by key+modifiers combination as <int>
+        self.__shortCutsByKey = {}
+        self.__updateShortCutsByKey()
 
         # ---- Set default font (monospace, 10pt)
         font = QFont()
@@ -352,6 +374,7 @@ class WCodeEditor(QPlainTextEdit):
         self.updateRequest.connect(self.__updateLineNumberArea)
         self.cursorPositionChanged.connect(self.__highlightCurrentLine)
         self.textChanged.connect(self.__updateCurrentPositionAndToken)
+        self.textChanged.connect(self.__checkVisibleLinesRules)
         self.selectionChanged.connect(self.__updateCurrentPositionAndToken)
         self.customContextMenuRequested.connect(self.__contextMenu)
 
@@ -410,7 +433,21 @@ class WCodeEditor(QPlainTextEdit):
             return
 
         if self.__cursorRow != previousRow or self.__cursorTokens is None or force:
-            self.__cursorTokens = self.__languageDef.tokenizer().tokenize(cursor.block().text())
+            # use tokens from block user data if block text is unchanged, otherwise tokenize
+            # block text and keep tokens in block user data
+            block = cursor.block()
+            blockText = block.text()
+            userData = block.userData()
+            if isinstance(userData, WCodeEditorBlockUserData) and userData.text() == blockText and userData.tokens() is not None:
+                self.__cursorTokens = userData.tokens()
+            else:
+                self.__cursorTokens = self.__languageDef.tokenizer().tokenize(blockText)
+                if userData is None:
+                    userData = WCodeEditorBlockUserData()
+                    block.setUserData(userData)
+                if isinstance(userData, WCodeEditorBlockUserData):
+                    userData.setText(blockText)
+                    userData.setTokens(self.__cursorTokens)
 
         # row is always 1 here as tokenized text is only current row
         self.__cursorToken = self.__cursorTokens.tokenAt(self.__cursorCol + 1, 1)
@@ -547,75 +584,90 @@ class WCodeEditor(QPlainTextEdit):
             if rect.contains(self.viewport().rect()):
                 self.__updateLineNumberAreaWidth(0)
 
+        if deltaY != 0:
+            # apply rules on blocks made visible by scroll
+            self.__checkVisibleLinesRules()
+
     def __highlightCurrentLine(self):
         """When the cursor position changes, highlight the current line (the line containing the cursor)"""
         # manage
         extraSelections = self.extraSelections()
 
-        position = 0
         # remove current selection from extra selection list
         # => can't clear selection as maybe, there's other extra selection
-        for index, selection in enumerate(extraSelections):
-            if selection.format.property(WCodeEditor.__EXTRASELECTIONPROP_TYPE) == WCodeEditor.__EXTRASELECTIONTYPE_CURRENTLINE:
-                # found, remove it and exit, no need to continue to search there's normaly only
-                # one extra selection like this one
-                extraSelections.remove(selection)
-                position = index
-                break
+        # => check first last known position, otherwise search it; there's normaly only
+        #    one extra selection like this one
+        position = self.__currentLineSelectionIndex
+        if position >= len(extraSelections) or extraSelections[position].format.property(WCodeEditor.__EXTRASELECTIONPROP_TYPE) != WCodeEditor.__EXTRASELECTIONTYPE_CURRENTLINE:
+            position = None
+            for index, selection in enumerate(extraSelections):
+                if selection.format.property(WCodeEditor.__EXTRASELECTIONPROP_TYPE) == WCodeEditor.__EXTRASELECTIONTYPE_CURRENTLINE:
+                    position = index
+                    break
+
+        if position is None:
+            position = 0
+        else:
+            extraSelections.pop(position)
 
         if self.__optionMultiLine and not self.isReadOnly():
-            selection = QTextEdit.ExtraSelection()
-
-            selection.format.setBackground(self.__optionColorHighlightedLine)
-            selection.format.setProperty(QTextFormat.FullWidthSelection, True)
-            selection.format.setProperty(WCodeEditor.__EXTRASELECTIONPROP_TYPE, WCodeEditor.__EXTRASELECTIONTYPE_CURRENTLINE)
-            selection.cursor = self.textCursor()
+            self.__currentLineSelection.format.setBackground(self.__optionColorHighlightedLine)
+            self.__currentLineSelection.cursor = self.textCursor()
 
             # insert extra selection to initial position in list
-            extraSelections.insert(position, selection)
+            extraSelections.insert(position, self.__currentLineSelection)
+            self.__currentLineSelectionIndex = position
 
         self.setExtraSelections(extraSelections)
         self.__updateCurrentPositionAndToken(False)
 
     def __rehighlightLinesRules(self):
-        """Re-apply highlight rules"""
-        cursorLine = self.textCursor().block().firstLineNumber()
+        """Re-apply highlight rules
+
+        Rules are applied on visible blocks only; other blocks are processed
+        when they become visible
+        """
+        self.__highlightedLinesRulesRevision += 1
+        self.__checkVisibleLinesRules()
 
-        block = self.document().firstBlock()
-        while block.isValid():
-            notCurrentLine = (block.blockNumber() != cursorLine)
-            self.checkIfHighlighted(block, not notCurrentLine)
+    def __checkVisibleLinesRules(self):
+        """Apply highlight rules on visible blocks for which current rules have not been applied"""
+        cursorLine = self.textCursor().blockNumber()
+        viewportBottom = self.viewport().height()
+
+        block = self.firstVisibleBlock()
+        top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
+        while block.isValid() and top <= viewportBottom:
+            userData = block.userData()
+            if not isinstance(userData, WCodeEditorBlockUserData) or userData.rulesRevision() != self.__highlightedLinesRulesRevision:
+                self.checkIfHighlighted(block, block.blockNumber() == cursorLine)
+            top += self.blockBoundingRect(block).height()
             block = block.next()
 
     def __isEmptyBlock(self, blockNumber):
         """Check is line for current block is empty or not"""
-        # get block text
-        cursor = self.textCursor()
-        cursor.movePosition(QTextCursor.Start)
-        cursor.movePosition(QTextCursor.NextBlock, n=blockNumber)
-        cursor.movePosition(QTextCursor.StartOfLine)
-        cursor.movePosition(QTextCursor.EndOfLine, QTextCursor.KeepAnchor)
-        text = cursor.selectedText()
-        if text.strip() == "":
-            return True
-        else:
-            return False
+        # get block text directly from document blocks index
+        return self.document().findBlockByNumber(blockNumber).text().strip() == ""
+
+    def __updateShortCutsByKey(self):
+        """Build shortcuts actions dictionary used by shortCut()
+
+        Shortcuts are QKeySequence with only one key+modifiers combination,
+        that can be used directly as an <int>
+        """
+        self.__shortCutsByKey = {keySequence[0]: action for keySequence, action in self.__shortCuts.items()}
 
     def __calculateIndent(self, position):
         """Calculate indent to apply according to current position"""
-        indentValue = ceil(position/self.__optionIndentWidth)*self.__optionIndentWidth - position
-        if indentValue == 0:
-            indentValue = self.__optionIndentWidth
-        return indentValue
+        # integer arithmetic: distance to next indent level (a full indent if already on an indent level)
+        indentWidth = self.__optionIndentWidth
+        return indentWidth - position % indentWidth
 
     def __calculateDedent(self, position):
         """calculate indent to apply according to current position"""
         if position > 0:
-            dedentValue = position % self.__optionIndentWidth
-            if dedentValue == 0:
-                return self.__optionIndentWidth
-            else:
-                return dedentValue
+            indentWidth = self.__optionIndentWidth
+            return position % indentWidth or indentWidth
 
         return 0
 
@@ -632,6 +684,9 @@ class WCodeEditor(QPlainTextEdit):
             contentRect = self.contentsRect()
             self.__lineNumberArea.setGeometry(QRect(contentRect.left(), contentRect.top(), self.lineNumberAreaWidth(), contentRect.height()))
 
+        # apply rules on blocks made visible by resize
+        self.__checkVisibleLinesRules()
+
     def lineNumberAreaPaintEvent(self, event):
         """Paint gutter content"""
         # initialise painter on WCELineNumberArea
@@ -656,30 +711,43 @@ class WCodeEditor(QPlainTextEdit):
 
         color = self.__optionGutterText.foreground().color()
 
-        lineNumberAreaWidth = self.__lineNumberArea.width() - WCodeEditor.__LINENUMBER_PADDING * 2
+        padding = WCodeEditor.__LINENUMBER_PADDING
+        fHeight = self.__fHeight
+        lineNumberAreaWidth = self.__lineNumberArea.width() - padding * 2
+        rectTop = event.rect().top()
+        rectBottom = event.rect().bottom()
+
+        # position of continuation lines is the same for all blocks
+        pX = padding + lineNumberAreaWidth - self.__fWidth//2
+        # continuation lines are drawn once all line numbers are drawn
+        continueLines = []
+
+        # rect used to draw extra selections and line numbers
+        selectionRect = QRectF()
+        textRect = QRectF()
+
+        painter.setPen(color)
 
         # Loop through all visible lines and paint the line numbers in the extra area for each line.
         # Note: in a plain text edit each line will consist of one QTextBlock
         #       if line wrapping is enabled, a line may span several rows in the text edit’s viewport
-        while block.isValid() and top <= event.rect().bottom():
+        while block.isValid() and top <= rectBottom:
             # Check if the block is visible in addition to check if it is in the areas viewport
             #   a block can, for example, be hidden by a window placed over the text edit
-            if block.isVisible() and bottom >= event.rect().top():
+            if block.isVisible() and bottom >= rectTop:
                 if userData := block.userData():
-                    for extraSelection in userData.extraSelections():
-                        painter.fillRect(QRectF(0, top, lineNumberAreaWidth, self.__fHeight), extraSelection.format.background())
+                    extraSelections = userData.extraSelections()
+                    if extraSelections:
+                        selectionRect.setRect(0, top, lineNumberAreaWidth, fHeight)
+                        for extraSelection in extraSelections:
+                            painter.fillRect(selectionRect, extraSelection.format.background())
 
-                number = f"{blockNumber + 1}"
-                painter.setPen(color)
-                painter.drawText(QRectF(WCodeEditor.__LINENUMBER_PADDING, top, lineNumberAreaWidth, self.__fHeight), Qt.AlignRight, number)
+                textRect.setRect(padding, top, lineNumberAreaWidth, fHeight)
+                painter.drawText(textRect, Qt.AlignRight, f"{blockNumber + 1}")
 
-                continueYStart = int(top + self.__fHeight)
+                continueYStart = int(top + fHeight)
                 if fHeight2 > 0 and int(bottom - fHeight2) > continueYStart:
-                    pX = WCodeEditor.__LINENUMBER_PADDING + lineNumberAreaWidth - self.__fWidth//2
-                    pen = QPen(color)
-                    pen.setWidth(3)
-                    painter.setPen(pen)
-                    painter.drawLine(pX, continueYStart, pX, int(bottom - fHeight2))
+                    continueLines.append(QLineF(pX, continueYStart, pX, int(bottom - fHeight2)))
 
             block = block.next()
             top = bottom
@@ -687,6 +755,12 @@ class WCodeEditor(QPlainTextEdit):
             bottom = top + blockH
             blockNumber += 1
 
+        if continueLines:
+            pen = QPen(color)
+            pen.setWidth(3)
+            painter.setPen(pen)
+            painter.drawLines(continueLines)
+
     def wheelEvent(self, event):
         """CTRL + wheel os used to zoom in/out font size"""
         if self.__optionWheelSetFontSize and event.modifiers() == Qt.ControlModifier:
@@ -728,7 +802,7 @@ class WCodeEditor(QPlainTextEdit):
         # retrieve action from current shortcut
         action = self.shortCut(event.key(), event.modifiers())
 
-        if len(self.__enclosingCharacters) and event.text() in self.__enclosingCharacters:
+        if event.text() in self.__enclosingCharacters:
             # enclosing character to manage!
             if self.textCursor().hasSelection():
                 self.doEnclose(event.text())
@@ -937,10 +1011,7 @@ class WCodeEditor(QPlainTextEdit):
 
         If nothing is defined, return None
         """
-        keySequence = QKeySequence(int(key) + int(modifiers))
-        if keySequence in self.__shortCuts:
-            return self.__shortCuts[keySequence]
-        return None
+        return self.__shortCutsByKey.get(int(key) + int(modifiers))
 
     def setShortCut(self, key, modifiers, action):
         """Set action for given key/modifier"""
@@ -957,10 +1028,12 @@ class WCodeEditor(QPlainTextEdit):
 
         keySequence = QKeySequence(int(key) + int(modifiers))
         self.__shortCuts[keySequence] = action
+        self.__updateShortCutsByKey()
 
     def clearShortcuts(self):
         """Remove all shortcuts"""
         self.__shortCuts = {}
+        self.__updateShortCutsByKey()
 
     def actionShortCut(self, action):
         """Return shortcuts for given action
@@ -1028,6 +1101,7 @@ class WCodeEditor(QPlainTextEdit):
 
                 # user data already exists, need to update it
                 userData.setExtraSelections(userDataExtraSelection)
+        userData.setRulesRevision(self.__highlightedLinesRulesRevision)
         # no need - updates made on user are already taken in account
         # block.setUserData(userData)
 